@@ -0,0 +1,134 @@
+"""
+Async variants of the hottest read and registration endpoints.
+
+They are plain Django async views (DRF views are sync-only) that keep the
+URL contract and JSON bytes of their DRF counterparts in ``views.py``: the
+same authentication, queries, row builders and renderer. Enabled with
+``ASYNC_VIEWS`` and meant to be served by an ASGI worker.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+
+from .authentication import UnifiedAuthentication
+from .cache import (
+    EVENT_LIST_VERSION_KEY, aget_version, cache_timeout, etag_for, etag_matches, not_modified, set_validators,
+    versioned_key,
+)
+from .idempotency import aidempotent
+from .models import AlreadyRegistered, Event
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .routers import primary_reads
+from .serializers import event_rows, event_values, registration_rows, registration_values
+from .views import (
+    ALREADY_REGISTERED, EVENT_NOT_FOUND, filter_events, participants_queryset, register_user,
+    registered_events_queryset, registered_events_state, registered_events_validator, registration_response_data,
+)
+
+renderer = FastJSONRenderer()
+authenticator = UnifiedAuthentication()
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    content = renderer.render(data) if data is not None else b''
+    return HttpResponse(content, status=status, headers=headers, content_type=renderer.media_type)
+
+
+def error_response(exc, request):
+    # Same payload shapes as DRF's default exception handler.
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % exc.wait
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, exc.status_code, headers)
+
+
+def async_api_view(methods):
+    """Authenticate like the DRF views (IsAuthenticated) and map API exceptions to JSON."""
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+                request.user, request.auth = result
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return error_response(exc, request)
+        return wrapper
+    return decorator
+
+
+@async_api_view(['GET'])
+async def list_events(request):
+    key = versioned_key(
+        'events:list', await aget_version(EVENT_LIST_VERSION_KEY),
+        request.build_absolute_uri(), timezone.localdate(),
+    )
+    etag = etag_for(key)
+    if etag_matches(request, etag):
+        response = json_response(None, status.HTTP_304_NOT_MODIFIED, {'ETag': etag})
+    else:
+        data = await cache.aget(key)
+        if data is None:
+            rows = event_values(filter_events(Event.objects.all(), request.GET))
+            paginator = KeysetPagination()
+            with primary_reads():  # as in cached_response
+                page = await paginator.apaginate_queryset(rows, Request(request))
+                if page is None:
+                    data = event_rows([row async for row in rows])
+                else:
+                    data = paginator.get_paginated_response(event_rows(page)).data
+            await cache.aset(key, data, cache_timeout())
+        response = json_response(data, headers={'ETag': etag})
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@async_api_view(['GET'])
+async def registered_events(request):
+    etag = etag_for(registered_events_validator(await registered_events_state(request.user).afirst()))
+    if not_modified(request, etag):
+        response = json_response(None, status.HTTP_304_NOT_MODIFIED)
+    else:
+        rows = [row async for row in registered_events_queryset(request.user)]
+        response = json_response(event_rows(rows, prefix='event__'))
+    set_validators(response, etag)
+    return response
+
+
+@async_api_view(['GET'])
+async def event_participants(request, event_id):
+    rows = [row async for row in registration_values(participants_queryset(event_id))]
+    return json_response(registration_rows(rows))
+
+
+@async_api_view(['POST'])
+@aidempotent(json_response)
+async def register_for_event(request, event_id):
+    try:
+        event = await Event.objects.only('id', 'title', 'coordinator_id').aget(id=event_id)
+    except Event.DoesNotExist:
+        return json_response(EVENT_NOT_FOUND, status.HTTP_404_NOT_FOUND)
+
+    # The seat claim, insert and outbox row must share one transaction, which
+    # the async ORM cannot open, so that block runs in the sync thread.
+    try:
+        registration = await sync_to_async(register_user)(request.user, event)
+    except AlreadyRegistered:
+        return json_response(ALREADY_REGISTERED, status.HTTP_400_BAD_REQUEST)
+    return json_response(registration_response_data(registration), status.HTTP_201_CREATED)
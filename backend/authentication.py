@@ -0,0 +1,118 @@
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPES, JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+User = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f'users:{user_id}'
+
+
+def get_cached_user(user_id):
+    """Return the user with ``user_id`` from the cache, loading it on a miss."""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 60))
+    return user
+
+
+async def aget_cached_user(user_id):
+    key = user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await User.objects.filter(pk=user_id).afirst()
+        if user is not None:
+            await cache.aset(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 60))
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the user through the short-TTL user cache."""
+
+    def get_user(self, validated_token):
+        return self.check_user(validated_token, get_cached_user(self.get_user_id(validated_token)))
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = await aget_cached_user(self.get_user_id(validated_token))
+        return self.check_user(validated_token, user), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, validated_token, user):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class UnifiedAuthentication(BaseAuthentication):
+    """
+    Pick one authentication scheme from the Authorization header instead of
+    trying Token, Session and JWT authentication in turn.
+
+    ``Bearer`` goes to cached JWT authentication, ``Token`` to DRF's token
+    authentication (when ``rest_framework.authtoken`` is installed) and a
+    request without the header falls back to the session cookie.
+    """
+    jwt_keywords = {header_type.encode() for header_type in AUTH_HEADER_TYPES}
+
+    def __init__(self):
+        self.jwt = CachedJWTAuthentication()
+        self.token = None
+        if apps.is_installed('rest_framework.authtoken'):
+            from rest_framework.authentication import TokenAuthentication
+            self.token = TokenAuthentication()
+        self.session = SessionAuthentication() if apps.is_installed('django.contrib.sessions') else None
+
+    def authenticate(self, request):
+        header = self.jwt.get_header(request)
+        if not header:
+            return self.session.authenticate(request) if self.session else None
+        keyword = header.split(b' ', 1)[0]
+        if keyword in self.jwt_keywords:
+            return self.jwt.authenticate(request)
+        if self.token is not None and keyword.lower() == self.token.keyword.lower().encode():
+            return self.token.authenticate(request)
+        return None
+
+    async def aauthenticate(self, request):
+        """Async variant for plain Django async views; JWT lookups stay on the event loop."""
+        header = self.jwt.get_header(request)
+        if header and header.split(b' ', 1)[0] in self.jwt_keywords:
+            return await self.jwt.aauthenticate(request)
+        return await sync_to_async(self.authenticate)(Request(request))
+
+    def authenticate_header(self, request):
+        return self.jwt.authenticate_header(request)
@@ -0,0 +1,103 @@
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connection, connections, reset_queries
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """
+    Run the block against a throwaway test database (``test_<NAME>``) with the
+    test environment installed: locmem email, DEBUG off and ``testserver`` in
+    ALLOWED_HOSTS. The real database is never written to.
+    """
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+    finally:
+        teardown_test_environment()
+
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {}
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))], 3)
+    return {
+        'p50_ms': pick(50), 'p90_ms': pick(90), 'p99_ms': pick(99),
+        'mean_ms': round(statistics.fmean(ordered), 3), 'max_ms': round(ordered[-1], 3),
+    }
+
+
+def count_queries(call):
+    with CaptureQueriesContext(connection) as captured:
+        call()
+    return len(captured)
+
+
+def run_load(call, requests, concurrency=1):
+    """
+    Invoke ``call(i)`` ``requests`` times across ``concurrency`` threads.
+
+    ``call`` returns an HTTP status code. Returns throughput, latency
+    percentiles and a histogram of status codes.
+    """
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                started = time.perf_counter()
+                code = call(i)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[code] = statuses.get(code, 0) + 1
+                reset_queries()
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        worker()
+    else:
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else None,
+        'statuses': {str(code): total for code, total in sorted(statuses.items())},
+        **percentiles(latencies),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,199 @@
+import csv
+import io
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_time
+
+from .cache import invalidate_dashboards
+from .models import Event, OutgoingEmail, Registration, bump_registrations_version
+from .search import index_events, unindexed_events
+
+User = get_user_model()
+
+CHUNK_SIZE = 1000
+EVENT_FIELDS = ('title', 'description', 'location', 'date', 'time')
+
+
+class BulkInputError(Exception):
+    pass
+
+
+def max_rows():
+    return getattr(settings, 'BULK_MAX_ROWS', 10000)
+
+
+def read_rows(request):
+    """Rows from a JSON array body or an uploaded CSV ``file``."""
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            text = io.TextIOWrapper(upload.file, encoding='utf-8-sig')
+            rows = list(csv.DictReader(text))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise BulkInputError(f'Could not read CSV upload: {exc}')
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        raise BulkInputError('Send a JSON array or a CSV file upload named "file".')
+    if not rows:
+        raise BulkInputError('No rows supplied.')
+    if len(rows) > max_rows():
+        raise BulkInputError(f'At most {max_rows()} rows per request.')
+    return rows
+
+
+def clean_event_row(row):
+    """Return ``(values, errors)`` for one event row without touching the database."""
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ['Expected an object.']}
+    errors, values = {}, {}
+    for field in EVENT_FIELDS:
+        value = row.get(field)
+        value = value.strip() if isinstance(value, str) else value
+        if value in (None, ''):
+            errors[field] = ['This field is required.']
+        else:
+            values[field] = value
+    for field in ('title', 'location'):
+        if field in values and len(str(values[field])) > Event._meta.get_field(field).max_length:
+            errors[field] = ['Ensure this field has no more than 255 characters.']
+    for field, parse, hint in (('date', parse_date, 'YYYY-MM-DD'), ('time', parse_time, 'hh:mm[:ss]')):
+        if field in values:
+            try:
+                parsed = parse(str(values[field]))
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                errors[field] = [f'Expected format {hint}.']
+            else:
+                values[field] = parsed
+    capacity = row.get('capacity')
+    if capacity not in (None, ''):
+        try:
+            values['capacity'] = int(capacity)
+            if values['capacity'] < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors['capacity'] = ['A valid non-negative integer is required.']
+    return values, errors
+
+
+def import_events(rows, coordinator):
+    results, events = [], []
+    for index, row in enumerate(rows):
+        values, errors = clean_event_row(row)
+        if errors:
+            results.append({'row': index, 'status': 'error', 'errors': errors})
+        else:
+            events.append(Event(coordinator=coordinator, **values))
+            results.append({'row': index, 'status': 'created'})
+
+    with transaction.atomic():
+        Event.objects.bulk_create(events, batch_size=CHUNK_SIZE)
+        # bulk_create skips post_save, so the search index is updated here.
+        if all(event.pk for event in events):
+            index_events(events)
+        else:
+            index_events(unindexed_events(coordinator.created_events.all()))
+
+    # Backends that return primary keys from bulk inserts let clients map rows to ids.
+    created = iter(events)
+    for result in results:
+        if result['status'] == 'created':
+            result['id'] = next(created).pk
+    return results, events
+
+
+def enroll(rows, actor):
+    """
+    Register many ``(username, event)`` pairs in one transaction.
+
+    Users, events and existing registrations are each resolved with a single
+    query, rows are inserted with ``bulk_create(ignore_conflicts=True)`` in
+    chunks and the affected events' counters are recomputed once at the end.
+    Seats are handed out in row order; rows past capacity are waitlisted.
+    """
+    results, pending = [None] * len(rows), []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or not row.get('username') or not str(row.get('event', '')).strip():
+            results[index] = {'row': index, 'status': 'error', 'errors': {'non_field_errors': ['"username" and "event" are required.']}}
+            continue
+        try:
+            pending.append((index, str(row['username']).strip(), int(row['event'])))
+        except (TypeError, ValueError):
+            results[index] = {'row': index, 'status': 'error', 'errors': {'event': ['Expected an event id.']}}
+
+    users = {
+        user.username: user
+        for user in User.objects.filter(username__in={username for _, username, _ in pending}).only('id', 'username', 'email')
+    }
+    event_ids = {event_id for _, _, event_id in pending}
+
+    with transaction.atomic():
+        events = Event.objects.select_for_update().filter(pk__in=event_ids).only('id', 'title', 'capacity', 'registration_count', 'coordinator_id')
+        if not actor.is_staff:
+            events = events.filter(coordinator=actor)
+        events = {event.pk: event for event in events}
+        existing = set(
+            Registration.objects.filter(event_id__in=events, user__in=users.values()).values_list('user_id', 'event_id')
+        )
+        seats = {
+            pk: None if event.capacity is None else max(event.capacity - event.registration_count, 0)
+            for pk, event in events.items()
+        }
+
+        registrations, emails = [], []
+        for index, username, event_id in pending:
+            user, event = users.get(username), events.get(event_id)
+            if user is None:
+                results[index] = {'row': index, 'status': 'error', 'errors': {'username': ['Unknown user.']}}
+                continue
+            if event is None:
+                results[index] = {'row': index, 'status': 'error', 'errors': {'event': ['Event not found or not authorized.']}}
+                continue
+            if (user.pk, event_id) in existing:
+                results[index] = {'row': index, 'status': 'duplicate'}
+                continue
+            existing.add((user.pk, event_id))
+
+            status = Registration.STATUS_CONFIRMED
+            if seats[event_id] is not None:
+                if seats[event_id] > 0:
+                    seats[event_id] -= 1
+                else:
+                    status = Registration.STATUS_WAITLISTED
+            registrations.append(Registration(user=user, event=event, status=status))
+            results[index] = {'row': index, 'status': status}
+            if status == Registration.STATUS_CONFIRMED:
+                message = f'Hi {user.username}, you have successfully registered for the event "{event.title}".'
+                subject = 'Event Registration Successful'
+            else:
+                message = f'Hi {user.username}, "{event.title}" is full. You have been added to the waitlist.'
+                subject = 'Event Waitlist'
+            if user.email:
+                emails.append(OutgoingEmail(
+                    subject=subject, message=message, from_email=settings.DEFAULT_FROM_EMAIL, recipient=user.email,
+                ))
+
+        Registration.objects.bulk_create(registrations, batch_size=CHUNK_SIZE, ignore_conflicts=True)
+        OutgoingEmail.objects.bulk_create(emails, batch_size=CHUNK_SIZE)
+        touched = {registration.event_id for registration in registrations}
+        if touched:
+            Event.objects.filter(pk__in=touched).reconcile_registration_counts()
+            bump_registrations_version(*{registration.user_id for registration in registrations})
+            invalidate_dashboards(*{events[event_id].coordinator_id for event_id in touched})
+    return results, touched
+
+
+def summarize(results, elapsed):
+    counts = Counter(result['status'] for result in results)
+    return {
+        'total': len(results),
+        'counts': dict(counts),
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'rows_per_second': round(len(results) / elapsed) if elapsed else None,
+        'results': results,
+    }
@@ -0,0 +1,151 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import primary_reads
+
+EVENT_LIST_VERSION_KEY = 'events:list:version'
+
+
+def event_version_key(event_id):
+    return f'events:{event_id}:version'
+
+
+def dashboard_version_key(coordinator_id):
+    return f'dashboard:{coordinator_id}:version'
+
+
+def get_version(key):
+    """
+    Return the current version counter stored under ``key``.
+
+    Counters start from a timestamp rather than 1 so that an evicted counter
+    never comes back at a value that still has stale payloads cached under it.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(key):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_events(*event_ids):
+    """
+    Bump the list version and each event's version once the current
+    transaction commits, so readers never cache pre-commit data under the
+    new version.
+    """
+    def bump():
+        bump_version(EVENT_LIST_VERSION_KEY)
+        for event_id in event_ids:
+            bump_version(event_version_key(event_id))
+    transaction.on_commit(bump)
+
+
+def invalidate_dashboards(*coordinator_ids):
+    # For any change to a coordinator's events or their registrations; on commit, as above.
+    def bump():
+        for coordinator_id in coordinator_ids:
+            bump_version(dashboard_version_key(coordinator_id))
+    transaction.on_commit(bump)
+
+
+def versioned_key(prefix, version, *parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'{prefix}:{version}:{digest}'
+
+
+def etag_for(cache_key):
+    return quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in [tag.removeprefix('W/') for tag in etags]
+
+
+def cache_timeout():
+    return getattr(settings, 'EVENT_CACHE_TIMEOUT', 300)
+
+
+def cached_response(request, cache_key, build):
+    """
+    Serve ``build()``'s payload from the cache under ``cache_key``.
+
+    The ETag is derived from the key alone, so a matching If-None-Match is
+    answered with 304 before anything is fetched or serialized. ``build()``
+    reads from the primary: whatever it returns is served under this key.
+    """
+    etag = etag_for(cache_key)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    else:
+        data = cache.get(cache_key)
+        if data is None:
+            with primary_reads():
+                data = build()
+            cache.set(cache_key, data, cache_timeout())
+        response = Response(data, headers={'ETag': etag})
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(request, etag, last_modified=None):
+    # If-None-Match wins over If-Modified-Since, as in RFC 9110.
+    if request.META.get('HTTP_IF_NONE_MATCH'):
+        return etag_matches(request, etag)
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and last_modified is not None and int(last_modified.timestamp()) <= since
+
+
+def conditional_response(request, validator, build, last_modified=None, max_age=None):
+    """
+    Serve ``build()``'s payload with an ETag derived from ``validator`` (a
+    string that changes whenever the payload would), or a bare 304 when the
+    client's copy is still current. ``max_age`` lets the browser reuse its
+    copy without asking; by default every use is revalidated.
+    """
+    etag = etag_for(validator)
+    if not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(build())
+    set_validators(response, etag, last_modified, max_age)
+    return response
+
+
+def set_validators(response, etag, last_modified=None, max_age=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if max_age:
+        patch_cache_control(response, private=True, max_age=max_age)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    # Per-user payloads behind the same URL.
+    patch_vary_headers(response, ['Authorization'])
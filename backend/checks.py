@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # Cache versions, ETags, replica stickiness and throttles are per process
+    # with locmem: each worker would serve its own stale copy.
+    if settings.CACHE_SHARED:
+        return []
+    return [Error(
+        'Deployments need a cache shared by every worker and service.',
+        hint='Set REDIS_URL (render.yaml wires it from the django-cache service).',
+        id='backend.E001',
+    )]
+
+
+@register(Tags.security, deploy=True)
+def check_metrics_token(app_configs, **kwargs):
+    # MetricsView refuses every scrape when DEBUG is off and no token is set.
+    if settings.METRICS_TOKEN:
+        return []
+    return [Warning(
+        '/api/metrics/ cannot be scraped without METRICS_TOKEN.',
+        hint='Set METRICS_TOKEN and send it to /api/metrics/ as a Bearer token.',
+        id='backend.W001',
+    )]
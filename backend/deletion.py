@@ -0,0 +1,197 @@
+"""
+Deletion of users and events in bounded batches.
+
+``Model.delete()`` makes Django's collector load every dependent row into
+memory before deleting anything. Here registrations and search terms are
+removed a batch at a time with plain ``DELETE ... WHERE id IN (...)``
+statements (neither model has dependents or delete signals, so Django
+fast-deletes them), cancellation notices for each batch go into the outbox
+with one INSERT, and the parent row is deleted last, once it is small.
+Graphs above ``DELETION_INLINE_ROWS`` are handed to a ``DeletionJob`` that
+``process_deletions`` works through in the background.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .cache import invalidate_dashboards, invalidate_events
+from .mail import promotion_messages
+from .models import DeletionJob, Event, OutgoingEmail, Registration, SearchTerm, bump_registrations_version
+
+User = get_user_model()
+
+JOB_SALT = 'backend.deletion.job'
+
+
+def inline_limit():
+    return getattr(settings, 'DELETION_INLINE_ROWS', 2000)
+
+
+def event_graph_size(event_id):
+    return Registration.objects.filter(event_id=event_id).count()
+
+
+def user_graph_size(user_id):
+    return Registration.objects.filter(Q(event__coordinator_id=user_id) | Q(user_id=user_id)).count()
+
+
+def delete_event(event_id, batch_size=1000, progress=None):
+    """
+    Delete an event, its registrations and search terms in batches of
+    ``batch_size``, queueing a cancellation notice for every registrant.
+    Safe to re-run after an interruption. Returns the number of rows deleted.
+    """
+    event = Event.objects.filter(pk=event_id).values('title', 'date', 'coordinator_id').first()
+    if event is None:
+        return 0
+    deleted = 0
+    # Registrations made while the loop runs are picked up by later batches.
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Registration.objects.filter(event_id=event_id).order_by('pk')
+                .values_list('pk', 'user_id', 'user__username', 'user__email')[:batch_size]
+            )
+            if not batch:
+                break
+            OutgoingEmail.objects.queue_many(
+                (
+                    'Event Cancelled',
+                    f'Hi {username}, "{event["title"]}" on {event["date"]} has been cancelled.',
+                    email,
+                )
+                for _, _, username, email in batch
+            )
+            Registration.objects.filter(pk__in=[row[0] for row in batch]).delete()
+            bump_registrations_version(*{row[1] for row in batch})
+        deleted += len(batch)
+        if progress:
+            progress(deleted)
+
+    while ids := list(SearchTerm.objects.filter(event_id=event_id).values_list('pk', flat=True)[:batch_size]):
+        SearchTerm.objects.filter(pk__in=ids).delete()
+
+    with transaction.atomic():
+        # Nothing large is left to cascade; this also fires the event's delete signals.
+        count, _ = Event.objects.filter(pk=event_id).delete()
+        invalidate_events(event_id)
+        invalidate_dashboards(event['coordinator_id'])
+    deleted += count
+    if progress:
+        progress(deleted)
+    return deleted
+
+
+def delete_user(user_id, batch_size=1000, progress=None):
+    """
+    Delete a user: their events (as ``delete_event``), then their own
+    registrations in batches, whose freed seats go to waitlisted
+    participants, then the account itself. Returns the number of rows deleted.
+    """
+    deleted = 0
+
+    def report(count):
+        if progress:
+            progress(deleted + count)
+
+    for event_id in list(Event.objects.filter(coordinator_id=user_id).values_list('pk', flat=True)):
+        deleted += delete_event(event_id, batch_size, report)
+
+    # The user holds at most one registration per event, so each batch frees
+    # at most one seat per event: one UPDATE covers every counter, and only
+    # events with a freed seat and a waitlist run their promotion, once.
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Registration.objects.filter(user_id=user_id).order_by('event_id')
+                .values_list('pk', 'event_id', 'status')[:batch_size]
+            )
+            if not batch:
+                break
+            # Locked in id order, like concurrent cancels and registrations see them.
+            events = list(
+                Event.objects.select_for_update().filter(pk__in={row[1] for row in batch}).order_by('pk')
+                .only('title', 'coordinator_id')
+            )
+            Registration.objects.filter(pk__in=[row[0] for row in batch]).delete()
+            freed = {event_id for _, event_id, status in batch if status == Registration.STATUS_CONFIRMED}
+            Event.objects.filter(pk__in=freed).update(registration_count=F('registration_count') - 1, updated_at=Now())
+            waitlisted = set(
+                Registration.objects.filter(event_id__in=freed, status=Registration.STATUS_WAITLISTED)
+                .values_list('event_id', flat=True).distinct()
+            )
+            notices = []
+            for event in events:
+                if event.pk in waitlisted:
+                    notices += promotion_messages(event, Registration.objects.promote_waitlisted(event))
+            OutgoingEmail.objects.queue_many(notices)
+            bump_registrations_version(user_id)
+            invalidate_events(*[event.pk for event in events])
+            invalidate_dashboards(*{event.coordinator_id for event in events})
+        deleted += len(batch)
+        report(0)
+
+    with transaction.atomic():
+        count, _ = User.objects.filter(pk=user_id).delete()
+    deleted += count
+    report(0)
+    return deleted
+
+
+def job_token(job):
+    return signing.Signer(salt=JOB_SALT).sign(str(job.pk))
+
+
+def read_job_token(token):
+    try:
+        return int(signing.Signer(salt=JOB_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def queue_deletion(kind, target_id, total):
+    # A repeated DELETE while the job is outstanding gets the same job back.
+    active = DeletionJob.objects.filter(
+        kind=kind, target_id=target_id, status__in=[DeletionJob.STATUS_PENDING, DeletionJob.STATUS_RUNNING],
+    ).first()
+    return active or DeletionJob.objects.create(kind=kind, target_id=target_id, total=total)
+
+
+def claim_job(stale_after):
+    """
+    Mark the oldest pending job (or a running one whose worker stopped
+    reporting progress) as running and return it, or None.
+    """
+    with transaction.atomic():
+        due = DeletionJob.objects.filter(
+            Q(status=DeletionJob.STATUS_PENDING)
+            | Q(status=DeletionJob.STATUS_RUNNING, updated_at__lt=timezone.now() - stale_after)
+        ).order_by('created_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        job = due.first()
+        if job is not None:
+            job.status = DeletionJob.STATUS_RUNNING
+            job.save(update_fields=['status', 'updated_at'])
+        return job
+
+
+def run_job(job, batch_size=1000):
+    def progress(deleted):
+        DeletionJob.objects.filter(pk=job.pk).update(deleted=deleted, updated_at=timezone.now())
+
+    delete = delete_user if job.kind == DeletionJob.KIND_USER else delete_event
+    try:
+        job.deleted = delete(job.target_id, batch_size, progress)
+    except Exception as exc:
+        job.status = DeletionJob.STATUS_FAILED
+        job.last_error = str(exc)[:1000]
+    else:
+        job.status = DeletionJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'deleted', 'last_error', 'finished_at', 'updated_at'])
+    return job
@@ -0,0 +1,95 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .models import Registration
+
+PARTICIPANT_COLUMNS = ['id', 'name', 'email', 'phone_number', 'department', 'year_of_study', 'college_name', 'event_title']
+PARTICIPANT_FIELDS = (
+    'id', 'user__username', 'user__email', 'user__phone_number', 'user__department',
+    'user__year_of_study', 'user__college_name',
+)
+# Spreadsheets run cells starting with these as formulas (CSV injection).
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def participant_rows(event, chunk_size=2000):
+    # Tuples straight from the cursor; no model instances are built.
+    rows = (
+        Registration.objects.filter(event=event)
+        .order_by('id')
+        .values_list(*PARTICIPANT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield row + (event.title,)
+
+
+def batched(lines, size):
+    # Join lines into larger writes so the WSGI server isn't fed one row at a time.
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def csv_cell(value):
+    # A leading quote makes spreadsheets show the text instead of evaluating it.
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(event, chunk_size=2000):
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(PARTICIPANT_COLUMNS)
+        for row in participant_rows(event, chunk_size):
+            yield writer.writerow([csv_cell(value) for value in row])
+    return batched(lines(), chunk_size)
+
+
+def stream_ndjson(event, chunk_size=2000):
+    def lines():
+        for row in participant_rows(event, chunk_size):
+            yield json.dumps(dict(zip(PARTICIPANT_COLUMNS, row)), ensure_ascii=False) + '\n'
+    return batched(lines(), chunk_size)
+
+
+async def aiterate(chunks):
+    # Each chunk is produced in the sync thread that runs the request's
+    # queries, so a server-side cursor stays on its connection.
+    iterator = iter(chunks)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(iterator, None)) is not None:
+            yield chunk
+    finally:
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_response(request, chunks, content_type):
+    """
+    Stream ``chunks`` under WSGI and ASGI alike. Django would read a sync
+    iterator into memory before sending it to an ASGI server, so ASGI
+    requests get an async iterator over the same chunks instead.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = aiterate(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
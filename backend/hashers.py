@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+# The tuned hashers keep Django's algorithm names, so existing hashes still
+# verify. Django's check_password() rehashes on the next successful login
+# whenever a stored hash uses another algorithm or other parameters than the
+# preferred (first) entry of PASSWORD_HASHERS.
+
+
+def hash_param(name, default):
+    return getattr(settings, 'PASSWORD_HASH_PARAMS', {}).get(name, default)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return hash_param('pbkdf2_iterations', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    # Defaults are Django's own (N=2**14, r=8, p=5), so stock hashes are never
+    # rehashed to something weaker; operators may still lower the cost.
+    @property
+    def work_factor(self):
+        return hash_param('scrypt_work_factor', ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return hash_param('scrypt_block_size', ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return hash_param('scrypt_parallelism', ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # scrypt needs about 128 * r * (n + p) bytes; leave headroom over OpenSSL's 32 MiB default.
+        return 2 * 128 * self.block_size * (self.work_factor + self.parallelism)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Needs the optional argon2-cffi package."""
+
+    @property
+    def time_cost(self):
+        return hash_param('argon2_time_cost', 2)
+
+    @property
+    def memory_cost(self):
+        return hash_param('argon2_memory_cost', 19456)  # KiB
+
+    @property
+    def parallelism(self):
+        return hash_param('argon2_parallelism', 1)
@@ -0,0 +1,118 @@
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CustomUser, Event, Registration
+
+FEED_KINDS = ('participant', 'coordinator')
+FEED_SALT = 'backend.ical.feed'
+BLOCK_FIELDS = ('id', 'title', 'description', 'location', 'date', 'time')
+# Events have no end time; calendars get a fixed slot.
+EVENT_DURATION = 'PT1H'
+CHUNK_SIZE = 500
+
+
+def feed_token(kind, user):
+    # The user's feed version is signed in, so bumping it revokes every old link.
+    return signing.Signer(salt=FEED_SALT).sign(f'{kind}:{user.pk}:{user.calendar_feed_version}')
+
+
+def read_feed_token(token):
+    """Return ``(kind, user_id)`` for a valid, unrevoked token, else None."""
+    try:
+        kind, user_id, version = signing.Signer(salt=FEED_SALT).unsign(token).split(':')
+        user_id, version = int(user_id), int(version)
+    except (signing.BadSignature, ValueError):
+        return None
+    if kind not in FEED_KINDS:
+        return None
+    current = CustomUser.objects.filter(pk=user_id, is_active=True, calendar_feed_version=version).exists()
+    return (kind, user_id) if current else None
+
+
+def block_key(event_id):
+    return f'ical:event:{event_id}'
+
+
+def invalidate_blocks(*event_ids):
+    # After commit, like invalidate_events, so a reader can't re-cache old rows.
+    transaction.on_commit(lambda: cache.delete_many([block_key(event_id) for event_id in event_ids]))
+
+
+def escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def fold(line):
+    # RFC 5545 3.1: lines longer than 75 octets continue after CRLF + space.
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:  # don't split a UTF-8 sequence
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def render_block(row):
+    starts = timezone.make_aware(datetime.datetime.combine(row['date'], row['time']))
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:event-{row['id']}@{settings.ICAL_UID_DOMAIN}",
+        f"DTSTAMP:{timezone.now().astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}",
+        f"DTSTART:{starts.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}",
+        f'DURATION:{EVENT_DURATION}',
+        f"SUMMARY:{escape(row['title'])}",
+        f"LOCATION:{escape(row['location'])}",
+        f"DESCRIPTION:{escape(row['description'])}",
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines)
+
+
+def blocks(event_ids):
+    """
+    Yield the VEVENT text of ``event_ids``, a chunk at a time. Blocks come
+    from the cache; only missing ones are read and rendered, then cached.
+    """
+    for start in range(0, len(event_ids), CHUNK_SIZE):
+        chunk = event_ids[start:start + CHUNK_SIZE]
+        cached = cache.get_many([block_key(event_id) for event_id in chunk])
+        missing = [event_id for event_id in chunk if block_key(event_id) not in cached]
+        if missing:
+            rendered = {
+                block_key(row['id']): render_block(row)
+                for row in Event.objects.filter(id__in=missing).values(*BLOCK_FIELDS)
+            }
+            cache.set_many(rendered, settings.ICAL_CACHE_TIMEOUT)
+            cached.update(rendered)
+        yield ''.join(cached.get(block_key(event_id), '') for event_id in chunk)
+
+
+def feed_event_ids(kind, user_id):
+    # Index-only lookups: (user, event) unique and (coordinator, ...) indexes.
+    if kind == 'coordinator':
+        return list(Event.objects.filter(coordinator_id=user_id).order_by('id').values_list('id', flat=True))
+    return list(
+        Registration.objects.filter(user_id=user_id, status=Registration.STATUS_CONFIRMED)
+        .order_by('event_id').values_list('event_id', flat=True)
+    )
+
+
+def stream_feed(kind, user_id):
+    event_ids = feed_event_ids(kind, user_id)
+    name = 'My events' if kind == 'coordinator' else 'Registered events'
+    yield (
+        'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Eventmng//Event calendar//EN\r\n'
+        f'CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\nX-WR-CALNAME:{name}\r\n'
+    )
+    yield from blocks(event_ids)
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,173 @@
+"""
+``Idempotency-Key`` support for mutating endpoints.
+
+The first request with a given key runs the view and stores a compact
+``(fingerprint, status, data)`` record in the cache for
+``IDEMPOTENCY_TTL`` seconds; retries with the same key get that response
+back without touching the database or the outbox. A duplicate that arrives
+while the first is still running waits for its record (up to
+``IDEMPOTENCY_WAIT`` seconds) instead of running the view again. Keys are
+scoped to the user, and a key reused for another method, path or body is
+rejected. Server errors are not stored, so they can be retried.
+
+Workers only see each other's keys through a shared cache, so the header is
+ignored unless ``IDEMPOTENCY_ENABLED``, which defaults to ``CACHE_SHARED``.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05  # seconds between checks while a duplicate is in flight
+IN_PROGRESS = object()
+
+INVALID_KEY = {'error': f'{HEADER} must be 1 to {MAX_KEY_LENGTH} characters.'}
+KEY_REUSED = {'error': f'This {HEADER} was already used for a different request.'}
+STILL_RUNNING = {'error': f'A request with this {HEADER} is still in progress.'}
+
+
+def record_key(user_id, key):
+    return f'idempotency:{user_id}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def lock_key(record):
+    return f'{record}:lock'
+
+
+def fingerprint(request):
+    # Read before the view parses the body; DRF then parses the cached copy.
+    body = getattr(request, '_request', request).body
+    return f'{request.method} {request.path} {hashlib.sha256(body).hexdigest()}'
+
+
+def claim(record):
+    """Return the stored record, None if the caller now holds the lock, or IN_PROGRESS."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while True:
+        stored = cache.get(record)
+        if stored is not None:
+            return stored
+        if cache.add(lock_key(record), 1, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            # The holder may have stored its record and unlocked since the get.
+            stored = cache.get(record)
+            if stored is not None:
+                cache.delete(lock_key(record))
+            return stored
+        if time.monotonic() >= deadline:
+            return IN_PROGRESS
+        time.sleep(POLL_INTERVAL)
+
+
+async def aclaim(record):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while True:
+        stored = await cache.aget(record)
+        if stored is not None:
+            return stored
+        if await cache.aadd(lock_key(record), 1, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            stored = await cache.aget(record)
+            if stored is not None:
+                await cache.adelete(lock_key(record))
+            return stored
+        if time.monotonic() >= deadline:
+            return IN_PROGRESS
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def check(request):
+    """
+    Return ``(record, early)``: the cache key to store the outcome under (None
+    when the request carries no key) and a ``(status, data, replayed)``
+    response to send instead of running the view, if any.
+    """
+    key = request.headers.get(HEADER)
+    if key is None or not settings.IDEMPOTENCY_ENABLED:
+        return None, None
+    if not 0 < len(key) <= MAX_KEY_LENGTH:
+        return None, (status.HTTP_400_BAD_REQUEST, INVALID_KEY, False)
+    return record_key(request.user.pk, key), None
+
+
+def outcome(request_fingerprint, stored):
+    if stored is IN_PROGRESS:
+        return status.HTTP_409_CONFLICT, STILL_RUNNING, False
+    stored_fingerprint, status_code, data = stored
+    if stored_fingerprint != request_fingerprint:
+        return status.HTTP_422_UNPROCESSABLE_ENTITY, KEY_REUSED, False
+    return status_code, data, True
+
+
+def replay_headers(status_code, replayed):
+    if replayed:
+        return {'Idempotent-Replayed': 'true'}
+    return {'Retry-After': '1'} if status_code == status.HTTP_409_CONFLICT else None
+
+
+def idempotent(view):
+    """Decorate a DRF handler: an APIView method or an ``@api_view`` function."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        request = args[1] if isinstance(args[0], APIView) else args[0]
+        record, early = check(request)
+        if record is not None:
+            request_fingerprint = fingerprint(request)
+            stored = claim(record)
+            if stored is not None:
+                early = outcome(request_fingerprint, stored)
+        if early is not None:
+            status_code, data, replayed = early
+            return Response(data, status=status_code, headers=replay_headers(status_code, replayed))
+        if record is None:
+            return view(*args, **kwargs)
+
+        try:
+            response = view(*args, **kwargs)
+            if response.status_code < 500:
+                cache.set(record, (request_fingerprint, response.status_code, response.data), settings.IDEMPOTENCY_TTL)
+        finally:
+            cache.delete(lock_key(record))
+        return response
+    return wrapper
+
+
+def aidempotent(respond):
+    """
+    The async counterpart for views returning rendered JSON; ``respond(data,
+    status, headers)`` builds their responses.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            record, early = check(request)
+            if record is not None:
+                request_fingerprint = fingerprint(request)
+                stored = await aclaim(record)
+                if stored is not None:
+                    early = outcome(request_fingerprint, stored)
+            if early is not None:
+                status_code, data, replayed = early
+                return respond(data, status_code, replay_headers(status_code, replayed))
+            if record is None:
+                return await view(request, *args, **kwargs)
+
+            try:
+                response = await view(request, *args, **kwargs)
+                if response.status_code < 500:
+                    data = json.loads(response.content) if response.content else None
+                    await cache.aset(
+                        record, (request_fingerprint, response.status_code, data), settings.IDEMPOTENCY_TTL,
+                    )
+            finally:
+                await cache.adelete(lock_key(record))
+            return response
+        return wrapper
+    return decorator
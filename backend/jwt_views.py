@@ -0,0 +1,14 @@
+"""
+simplejwt views, kept out of ``views.py`` so that the token serializers and
+views are only imported when a login or refresh request first arrives (see
+``lazy_view`` in ``urls.py``).
+"""
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from .throttling import LoginRateThrottle
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    # Rate-limited before the serializer runs authenticate() and hashes anything.
+    throttle_classes = [LoginRateThrottle]
+
@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .metrics import EMAIL_SEND_SECONDS
+from .models import Event, OutgoingEmail, Registration
+
+
+def promotion_messages(event, promoted):
+    return [
+        (
+            'Event Registration Confirmed',
+            f'Hi {registration.user.username}, a seat opened up and your registration for "{event.title}" is now confirmed.',
+            registration.user.email,
+        )
+        for registration in promoted
+    ]
+
+
+def queue_promotion_emails(event, promoted):
+    # One INSERT for everyone a freed seat went to.
+    OutgoingEmail.objects.queue_many(promotion_messages(event, promoted))
+
+
+def queue_event_reminders(window, batch_size=500, now=None):
+    """
+    Queue a reminder for every confirmed registration of the events starting
+    within ``window`` of ``now``. ``reminder_sent_for`` records the start time
+    each participant was reminded of, so later runs skip them until the event
+    is rescheduled. Returns ``(events, queued)``.
+    """
+    now = now or timezone.now()
+    # One range scan on the starts_at index.
+    events = list(
+        Event.objects.filter(starts_at__gte=now, starts_at__lt=now + window)
+        .order_by('starts_at', 'id').values('id', 'title', 'location', 'date', 'time', 'starts_at')
+    )
+    queued = 0
+    for event in events:
+        while True:
+            with transaction.atomic():
+                due = (
+                    Registration.objects.filter(event_id=event['id'], status=Registration.STATUS_CONFIRMED)
+                    .exclude(reminder_sent_for=event['starts_at']).order_by('pk')
+                )
+                if connection.features.has_select_for_update_skip_locked:
+                    # Parallel schedulers split the rows instead of both sending them.
+                    of = ('self',) if connection.features.has_select_for_update_of else ()
+                    due = due.select_for_update(skip_locked=True, of=of)
+                batch = list(due.values_list('pk', 'user__username', 'user__email')[:batch_size])
+                if not batch:
+                    break
+                OutgoingEmail.objects.queue_many(
+                    (
+                        'Event Reminder',
+                        f'Hi {username}, "{event["title"]}" starts on {event["date"]} at '
+                        f'{event["time"]:%H:%M} in {event["location"]}.',
+                        email,
+                    )
+                    for _, username, email in batch
+                )
+                Registration.objects.filter(pk__in=[row[0] for row in batch]).update(reminder_sent_for=event['starts_at'])
+            queued += len(batch)
+    return len(events), queued
+
+
+def lease_due_emails(batch_size, lease_seconds):
+    """
+    Claim up to ``batch_size`` due rows in a short transaction by pushing
+    their ``next_attempt_at`` past the lease, so other dispatchers skip them
+    while they are being sent. Rows a crashed dispatcher leased come due
+    again once the lease runs out.
+    """
+    with transaction.atomic():
+        due = OutgoingEmail.objects.due()
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        if batch:
+            OutgoingEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=lease_seconds)
+            )
+    return batch
+
+
+def send_pending_emails(batch_size=100, max_attempts=5, base_delay=30, lease_seconds=300):
+    """
+    Deliver one batch of due outbox rows over a single SMTP connection.
+
+    The rows are leased in one short transaction, sent with no transaction
+    open, and the outcomes written back in another, so SMTP latency never
+    holds row locks. Returns a ``(sent, failed)`` tuple for the batch.
+    """
+    batch = lease_due_emails(batch_size, lease_seconds)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    smtp = get_connection(fail_silently=False)
+    try:
+        smtp.open()
+    except Exception as exc:
+        # The server is unreachable: back off every row in the batch.
+        for email in batch:
+            email.mark_failed(exc, max_attempts, base_delay)
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=[email.recipient],
+                connection=smtp,
+            )
+            started = time.perf_counter()
+            try:
+                message.send()
+            except Exception as exc:
+                EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, 'failed')
+                email.mark_failed(exc, max_attempts, base_delay)
+                failed += 1
+            else:
+                EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, 'sent')
+                email.status = OutgoingEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                sent += 1
+    finally:
+        smtp.close()
+
+    OutgoingEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return sent, failed
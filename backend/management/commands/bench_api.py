@@ -0,0 +1,107 @@
+import json
+import platform
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.benchmarking import benchmark_database, count_queries, git_revision, run_load
+from backend.models import Event, Registration
+from backend.seeding import seed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints through Django's test client against a "
+        "seeded throwaway database and print throughput, latency percentiles and "
+        "query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--events', type=int, default=200)
+        parser.add_argument('--registrations', type=int, default=20000)
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument('--login-requests', type=int, default=20, help="Login hashes passwords; keep it small.")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--cold-cache', action='store_true', help="Clear the cache before every request.")
+        parser.add_argument('--only', nargs='*', help="Run only these endpoint names.")
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        # Login throttling would turn the login benchmark into a 429 benchmark.
+        with benchmark_database(keepdb=options['keepdb']), override_settings(LOGIN_RATE_LIMITS={}):
+            if not Registration.objects.exists():
+                seed(options['users'], options['events'], options['registrations'])
+            results = self.run_endpoints(options)
+
+        report = {
+            'revision': git_revision(),
+            'vendor': connection.vendor,
+            'python': platform.python_version(),
+            'dataset': {key: options[key] for key in ('users', 'events', 'registrations')},
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        self.stdout.write(output)
+
+    def endpoints(self, options):
+        users = list(User.objects.filter(username__startswith='seed_user_').order_by('id'))
+        busiest = Event.objects.order_by('-registration_count').first()
+        fresh_event = Event.objects.create(
+            title='Benchmark', description='', location='Hall', date=busiest.date, time=busiest.time,
+            coordinator=busiest.coordinator,
+        )
+        tokens = {user.pk: str(AccessToken.for_user(user)) for user in users}
+        participant = users[1]
+
+        def get(path, user):
+            def call(i):
+                if options['cold_cache']:
+                    cache.clear()
+                return Client().get(path, HTTP_AUTHORIZATION=f'Bearer {tokens[user.pk]}').status_code
+            return call
+
+        def login(i):
+            user = users[i % len(users)]
+            return Client().post(
+                '/api/login/', {'username': user.username, 'password': 'password'}, content_type='application/json',
+            ).status_code
+
+        def register(i):
+            # Each request is a different user joining an empty event, so every call takes the 201 path.
+            user = users[i % len(users)]
+            return Client().post(
+                f'/api/events/{fresh_event.pk}/register/', HTTP_AUTHORIZATION=f'Bearer {tokens[user.pk]}',
+            ).status_code
+
+        return {
+            'login': (login, options['login_requests']),
+            'list_events': (get('/api/events/', participant), options['requests']),
+            'list_events_page': (get('/api/events/?page_size=20', participant), options['requests']),
+            'register_for_event': (register, min(options['requests'], len(users) - 1)),
+            'event_participants': (get(f'/api/participants/{busiest.pk}/', busiest.coordinator), options['requests']),
+            'registered_events': (get('/api/events/registered/', participant), options['requests']),
+        }
+
+    def run_endpoints(self, options):
+        results = {}
+        for name, (call, requests) in self.endpoints(options).items():
+            if options['only'] and name not in options['only']:
+                continue
+            cache.clear()
+            # Query count of a single cold request (as the last seeded user, who the
+            # load below never reaches), measured on this thread's connection.
+            queries = count_queries(lambda: call(-1))
+            results[name] = {'queries_per_request': queries, **run_load(call, requests, options['concurrency'])}
+            self.stderr.write(f"{name}: {results[name]['throughput_rps']} req/s")
+        return results
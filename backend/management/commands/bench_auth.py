@@ -0,0 +1,53 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.authentication import UnifiedAuthentication
+from backend.benchmarking import benchmark_database, count_queries, git_revision, run_load
+from backend.views import MyEventsView, UserDetailView
+
+User = get_user_model()
+
+CHAINS = {
+    'legacy_chain': [TokenAuthentication, SessionAuthentication, JWTAuthentication],
+    'unified': [UnifiedAuthentication],
+}
+
+
+class Command(BaseCommand):
+    help = "Compare the old Token/Session/JWT chain with UnifiedAuthentication on authenticated GETs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=1)
+
+    def handle(self, *args, **options):
+        views = (UserDetailView, MyEventsView)
+        originals = {view: view.authentication_classes for view in views}
+        results = {}
+        with benchmark_database():
+            user = User.objects.create_user('bench', email='bench@example.com', password='password', role='coordinator')
+            header = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+            try:
+                for chain, classes in CHAINS.items():
+                    for view in views:
+                        view.authentication_classes = classes
+                    cache.clear()
+                    for path in ('/api/user/', '/api/events/my-events/'):
+                        def call(i, path=path):
+                            return Client().get(path, **header).status_code
+                        call(0)  # warm the user cache
+                        results[f'{chain} {path}'] = {
+                            'queries_per_request': count_queries(lambda: call(0)),
+                            **run_load(call, options['requests'], options['concurrency']),
+                        }
+            finally:
+                for view, classes in originals.items():
+                    view.authentication_classes = classes
+        self.stdout.write(json.dumps({'revision': git_revision(), 'results': results}, indent=2))
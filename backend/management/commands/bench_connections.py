@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.benchmarking import benchmark_database, git_revision, run_load
+
+User = get_user_model()
+
+
+def request(client, path, header):
+    status = client.get(path, **header).status_code
+    # The test client detaches close_old_connections from request_finished;
+    # run it here so CONN_MAX_AGE is honoured like under a real server.
+    close_old_connections()
+    return status
+
+
+class Command(BaseCommand):
+    help = "Measure per-request connection overhead with persistent connections off and on."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--max-age', type=int, default=60, help="CONN_MAX_AGE for the reuse run.")
+
+    def handle(self, *args, **options):
+        results = {}
+        with benchmark_database():
+            if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+                self.stderr.write(
+                    "In-memory SQLite connections are never closed; set DB_TEST_NAME to a file "
+                    "(or use MySQL/PostgreSQL) for a meaningful comparison."
+                )
+            user = User.objects.create_user('bench', password='password', role='coordinator')
+            header = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+            client = Client()
+            opened = []
+
+            def count(sender, connection, **kwargs):
+                opened.append(connection.alias)
+            connection_created.connect(count)
+            try:
+                for label, max_age in (('reconnect_per_request', 0), ('persistent', options['max_age'])):
+                    for path in ('/api/health/', '/api/events/my-events/'):
+                        connection.close()
+                        connection.settings_dict['CONN_MAX_AGE'] = max_age
+                        opened.clear()
+                        stats = run_load(lambda i, path=path: request(client, path, header), options['requests'])
+                        results[f'{label} {path}'] = {'conn_max_age': max_age, 'connections_opened': len(opened), **stats}
+            finally:
+                connection_created.disconnect(count)
+        self.stdout.write(json.dumps({'revision': git_revision(), 'vendor': connection.vendor, 'results': results}, indent=2))
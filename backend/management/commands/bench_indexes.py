@@ -0,0 +1,95 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from backend.benchmarking import benchmark_database
+from backend.models import Event, Registration
+from backend.seeding import seed
+
+User = get_user_model()
+TUNED_MODELS = (User, Event, Registration)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and compare query plans and timings of the "
+        "hot view queries with and without the tuned Meta.indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--registrations', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query.")
+        parser.add_argument('--json', action='store_true', help="Print only the JSON summary.")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse/keep the benchmark database.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        with benchmark_database(keepdb=options['keepdb']):
+            if not Registration.objects.exists():
+                self.log("Seeding...")
+                seed(options['users'], options['events'], options['registrations'], stdout=None if options['json'] else self.stdout)
+            after = self.measure('after')
+            self.toggle_tuned_indexes(enabled=False)
+            try:
+                before = self.measure('before')
+            finally:
+                self.toggle_tuned_indexes(enabled=True)
+
+        summary = {
+            name: {
+                'before_ms': before[name],
+                'after_ms': after[name],
+                'speedup': round(before[name] / after[name], 2) if after[name] else None,
+            }
+            for name in after
+        }
+        self.stdout.write(json.dumps({'vendor': connection.vendor, 'queries': summary}, indent=2))
+
+    def log(self, message):
+        if not self.options['json']:
+            self.stdout.write(message)
+
+    def toggle_tuned_indexes(self, enabled):
+        with connection.schema_editor() as editor:
+            for model in TUNED_MODELS:
+                for index in model._meta.indexes:
+                    (editor.add_index if enabled else editor.remove_index)(model, index)
+
+    def hot_queries(self):
+        event = Event.objects.order_by('-registration_count').only('id', 'coordinator_id', 'date').first()
+        user = Registration.objects.filter(event=event).select_related('user').first().user
+        return {
+            'list_upcoming_page': Event.objects.select_related('coordinator')
+                .filter(date__gte=event.date).order_by('date', 'time', 'id')[:20],
+            'coordinator_events': Event.objects.select_related('coordinator')
+                .filter(coordinator_id=event.coordinator_id).order_by('date', 'time', 'id'),
+            'event_participants': Registration.objects.filter(event=event)
+                .select_related('user').order_by('id')[:500],
+            'registered_events': Registration.objects.filter(user=user).select_related('event__coordinator'),
+            'waitlist_head': Registration.objects.filter(event=event, status=Registration.STATUS_WAITLISTED)
+                .order_by('registered_at', 'id')[:1],
+            'event_stats': Registration.objects.filter(event=event)
+                .values('status', 'user__department').annotate(total=Count('id')).order_by(),
+            'login_by_email': User.objects.filter(email=user.email),
+        }
+
+    def measure(self, label):
+        self.log(f"\n=== {label} ===")
+        timings = {}
+        for name, queryset in self.hot_queries().items():
+            self.log(f"\n-- {name}\n{queryset.explain()}")
+            samples = []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = round(statistics.median(samples), 3)
+            self.log(f"median {timings[name]} ms")
+        return timings
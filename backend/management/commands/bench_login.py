@@ -0,0 +1,54 @@
+import importlib.util
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from backend.benchmarking import benchmark_database, git_revision, run_load
+from backend.throttling import reset_buckets
+
+User = get_user_model()
+
+POLICIES = {
+    'django_default_pbkdf2': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    'tuned_pbkdf2': ['backend.hashers.TunedPBKDF2PasswordHasher'],
+    'tuned_scrypt': ['backend.hashers.TunedScryptPasswordHasher'],
+    'tuned_argon2': ['backend.hashers.TunedArgon2PasswordHasher'],
+}
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput per password hasher policy and the cost of throttled login storms."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=40)
+        parser.add_argument('--storm-requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=4)
+
+    def handle(self, *args, **options):
+        results = {}
+        with benchmark_database():
+            for name, hashers in POLICIES.items():
+                if name == 'tuned_argon2' and importlib.util.find_spec('argon2') is None:
+                    results[name] = 'skipped: argon2-cffi is not installed'
+                    continue
+                with override_settings(PASSWORD_HASHERS=hashers, LOGIN_RATE_LIMITS={}):
+                    User.objects.create_user(name, password='password', role='participant')
+                    results[name] = run_load(self.login(name, 'password'), options['requests'], options['concurrency'])
+
+            # A retry storm against one account with the configured limits:
+            # everything past the burst is rejected before hashing.
+            reset_buckets()
+            results['storm_throttled'] = run_load(
+                self.login('tuned_scrypt', 'wrong-password'), options['storm_requests'], options['concurrency'],
+            )
+            reset_buckets()
+        self.stdout.write(json.dumps({'revision': git_revision(), 'results': results}, indent=2))
+
+    def login(self, username, password):
+        def call(i):
+            return Client().post(
+                '/api/login/', {'username': username, 'password': password}, content_type='application/json',
+            ).status_code
+        return call
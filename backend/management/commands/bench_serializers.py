@@ -0,0 +1,72 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from backend.benchmarking import benchmark_database, git_revision
+from backend.models import Event, Registration
+from backend.renderers import FastJSONRenderer, orjson
+from backend.seeding import seed
+from backend.serializers import (
+    EventSerializer, RegistrationSerializer, event_rows, event_values, registration_rows, registration_values,
+)
+
+
+def timed(build, repeat):
+    # Best of ``repeat`` runs, so one GC pause doesn't skew the per-row cost.
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = "Compare per-row cost of the DRF serializers against the values() fast path and the renderers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        results = {}
+        with benchmark_database():
+            user_ids, event_ids = seed(users=rows, events=rows, registrations=0, prefix='bench')
+            # Every user on one event, so a single participants list has ``rows`` entries.
+            event_id = event_ids[0]
+            Registration.objects.bulk_create(
+                [Registration(user_id=user_id, event_id=event_id) for user_id in user_ids], batch_size=1000,
+            )
+            cases = {
+                'events': (
+                    lambda: EventSerializer(Event.objects.select_related('coordinator'), many=True).data,
+                    lambda: event_rows(event_values(Event.objects.all())),
+                ),
+                'participants': (
+                    lambda: RegistrationSerializer(
+                        Registration.objects.filter(event_id=event_id).select_related('user', 'event'), many=True,
+                    ).data,
+                    lambda: registration_rows(registration_values(Registration.objects.filter(event_id=event_id))),
+                ),
+            }
+            for name, (serializer, fast_path) in cases.items():
+                serializer_seconds, expected = timed(serializer, repeat)
+                fast_seconds, data = timed(fast_path, repeat)
+                count = len(data)
+                stock_seconds, stock_bytes = timed(lambda: JSONRenderer().render(expected), repeat)
+                fast_render_seconds, fast_bytes = timed(lambda: FastJSONRenderer().render(data), repeat)
+                results[name] = {
+                    'rows': count,
+                    'serializer_us_per_row': round(serializer_seconds * 1e6 / count, 2),
+                    'values_us_per_row': round(fast_seconds * 1e6 / count, 2),
+                    'json_renderer_us_per_row': round(stock_seconds * 1e6 / count, 2),
+                    'fast_renderer_us_per_row': round(fast_render_seconds * 1e6 / count, 2),
+                    'identical_bytes': stock_bytes == fast_bytes,
+                }
+        self.stdout.write(json.dumps(
+            {'revision': git_revision(), 'orjson': orjson is not None, 'results': results}, indent=2,
+        ))
@@ -0,0 +1,160 @@
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.benchmarking import git_revision
+
+# Run in a fresh interpreter: everything a worker imports before serving.
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns  # imports the URLconf and every view module
+from eventmng.wsgi import application
+elapsed = time.perf_counter() - started
+try:
+    with open('/proc/self/statm') as statm:
+        rss_kb = int(statm.read().split()[1]) * (__import__('os').sysconf('SC_PAGE_SIZE') // 1024)
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == 'darwin' else 1)
+print(json.dumps({'seconds': elapsed, 'rss_kb': rss_kb, 'modules': len(sys.modules)}))
+"""
+
+PROJECT_DIR = Path(settings.BASE_DIR)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    found = []
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # The command name may contain spaces; the fields after ')' don't.
+            fields = stat.read_text().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            found.append(int(stat.parent.name))
+    return sorted(found)
+
+
+def memory_kb(pid):
+    # Rss counts shared pages in full; Pss splits them between the sharers and
+    # Private is what the worker alone costs, i.e. what preloading saves.
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                values[name] = int(rest.split()[0])
+    return {'rss_kb': values['Rss'], 'pss_kb': values['Pss'], 'private_kb': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def served(port, host):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        connection.request('GET', '/api/health/', headers={'Host': host})
+        return connection.getresponse().status
+    except OSError:
+        return None
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Measure import time and per-worker memory for each settings profile, with and without preload_app."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-modules', nargs='+', default=['eventmng.settings', 'eventmng.settings_lean'],
+        )
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per import measurement.")
+        parser.add_argument('--workers', type=int, default=2, help="Gunicorn workers to boot; 0 skips gunicorn.")
+        parser.add_argument('--timeout', type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        results = {}
+        for module in options['settings_modules']:
+            env = {**os.environ, 'DJANGO_SETTINGS_MODULE': module}
+            results[module] = {'import': self.measure_imports(env, options['runs'])}
+            if options['workers'] and not Path('/proc/self/smaps_rollup').exists():
+                self.stderr.write("Per-worker memory needs Linux /proc; skipping the gunicorn runs.")
+                options['workers'] = 0
+            for preload in ('0', '1') if options['workers'] else ():
+                label = 'gunicorn_preload' if preload == '1' else 'gunicorn'
+                results[module][label] = self.measure_gunicorn(
+                    {**env, 'GUNICORN_PRELOAD': preload}, options['workers'], options['timeout'],
+                )
+        self.stdout.write(json.dumps({'revision': git_revision(), 'results': results}, indent=2))
+
+    def measure_imports(self, env, runs):
+        samples = []
+        for _ in range(runs):
+            completed = subprocess.run(
+                [sys.executable, '-c', IMPORT_PROBE], cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+            )
+            if completed.returncode:
+                raise CommandError(completed.stderr.strip().splitlines()[-1])
+            samples.append(json.loads(completed.stdout))
+        return {
+            'median_ms': round(statistics.median(sample['seconds'] for sample in samples) * 1000, 1),
+            'min_ms': round(min(sample['seconds'] for sample in samples) * 1000, 1),
+            'rss_kb': int(statistics.median(sample['rss_kb'] for sample in samples)),
+            'modules': samples[-1]['modules'],
+        }
+
+    def measure_gunicorn(self, env, workers, timeout):
+        port = free_port()
+        env = {**env, 'PORT': str(port), 'WEB_CONCURRENCY': str(workers)}
+        log = tempfile.TemporaryFile()
+        started = time.perf_counter()
+        master = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+            cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log,
+        )
+        try:
+            # Ready once every worker is up and a request has been answered.
+            status = None
+            while time.perf_counter() - started < timeout and master.poll() is None:
+                if len(children(master.pid)) >= workers:
+                    status = served(port, settings.ALLOWED_HOSTS[0])
+                    if status is not None:
+                        break
+                time.sleep(0.05)
+            if status is None:
+                log.seek(0)
+                raise CommandError(f"gunicorn did not come up:\n{log.read().decode(errors='replace')[-2000:]}")
+            ready = time.perf_counter() - started
+            worker_memory = [memory_kb(pid) for pid in children(master.pid)]
+            return {
+                'ready_ms': round(ready * 1000, 1),
+                'health_status': status,
+                'master': memory_kb(master.pid),
+                'workers': worker_memory,
+                'worker_private_kb_mean': int(statistics.fmean(memory['private_kb'] for memory in worker_memory)),
+            }
+        finally:
+            master.send_signal(signal.SIGTERM)
+            try:
+                master.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                master.kill()
+            log.close()
@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from backend.deletion import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Work through queued user and event deletions in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of draining once.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Idle poll interval in seconds.")
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help="Seconds without progress before a running job is taken over.",
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after'])
+        while True:
+            job = claim_job(stale_after)
+            if job is not None:
+                started = time.perf_counter()
+                run_job(job, options['batch_size'])
+                self.stdout.write(
+                    f"{job}: deleted={job.deleted} seconds={time.perf_counter() - started:.1f}"
+                    + (f" error={job.last_error}" if job.last_error else "")
+                )
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
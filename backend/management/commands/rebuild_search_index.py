@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from backend.cache import invalidate_events
+from backend.models import Event
+from backend.search import index_events, unindexed_events
+
+
+class Command(BaseCommand):
+    help = "Rebuild the event search index, or only fill in events that have no terms yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help="Limit to these events (default: all).")
+        parser.add_argument('--missing', action='store_true', help="Only index events without search terms.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.only('id', 'title', 'description', 'location').order_by('id')
+        if options['event_ids']:
+            events = events.filter(pk__in=options['event_ids'])
+        if options['missing']:
+            events = unindexed_events(events)
+        count = events.count()
+        index_events(events.iterator(chunk_size=1000))
+        invalidate_events(*options['event_ids'])
+        self.stdout.write(f"Indexed {count} event(s).")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from backend.cache import invalidate_events
+from backend.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recompute Event.registration_count from confirmed registrations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help="Limit to these events (default: all).")
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if options['event_ids']:
+            events = events.filter(pk__in=options['event_ids'])
+        # Only drifted events are rewritten, and each one's cached detail is
+        # invalidated along with the list.
+        drifted = list(events.with_drifted_registration_count().values_list('pk', flat=True))
+        updated = Event.objects.filter(pk__in=drifted).reconcile_registration_counts() if drifted else 0
+        invalidate_events(*drifted)
+        self.stdout.write(f"Reconciled {updated} event(s).")
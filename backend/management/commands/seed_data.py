@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.seeding import seed
+
+
+class Command(BaseCommand):
+    help = "Insert synthetic users, events and registrations with bulk_create (password: \"password\")."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=100)
+        parser.add_argument('--registrations', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed', help="Username prefix; use a new one to seed again.")
+        parser.add_argument('--random-seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            seed(
+                users=options['users'], events=options['events'], registrations=options['registrations'],
+                batch_size=options['batch_size'], prefix=options['prefix'], seed_value=options['random_seed'],
+                stdout=self.stdout,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s"))
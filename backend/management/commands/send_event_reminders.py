@@ -0,0 +1,26 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from backend.mail import queue_event_reminders
+
+
+class Command(BaseCommand):
+    help = "Queue reminder emails for events starting within the next --hours; safe to run repeatedly."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24.0)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help="Keep scheduling instead of running once.")
+        parser.add_argument('--interval', type=float, default=300.0, help="Seconds between runs.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            events, queued = queue_event_reminders(timedelta(hours=options['hours']), batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"events={events} queued={queued} ms={elapsed * 1000:.1f}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
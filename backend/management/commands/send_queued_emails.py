@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.mail import send_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over one reused SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--retry-delay', type=int, default=30, help="Base backoff in seconds.")
+        parser.add_argument(
+            '--lease', type=int, default=300, help="Seconds a claimed batch stays hidden from other dispatchers.",
+        )
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of draining once.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Idle poll interval in seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            sent, failed = send_pending_emails(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                base_delay=options['retry_delay'],
+                lease_seconds=options['lease'],
+            )
+            if sent or failed:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"sent={sent} failed={failed} ms_per_email={elapsed * 1000 / (sent + failed):.1f}")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
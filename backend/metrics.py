@@ -0,0 +1,87 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets, in seconds and bytes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        # One bucket slot per bound plus +Inf; cumulated only when rendered.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, [list(counts), total, count]) for key, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            labels = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{self.name}_sum{suffix} {total:.6f}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+ROUTE_LABELS = ('method', 'route', 'status')
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request.', ROUTE_LABELS, LATENCY_BUCKETS)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries executed per request.', ROUTE_LABELS, QUERY_BUCKETS)
+DB_SECONDS = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL per request.', ROUTE_LABELS, LATENCY_BUCKETS)
+RENDER_SECONDS = Histogram(
+    'http_request_render_duration_seconds', 'Time spent rendering serialized data into the response body.',
+    ROUTE_LABELS, LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram(
+    'http_response_size_bytes', 'Response body size; streamed responses are not counted.', ROUTE_LABELS, SIZE_BUCKETS)
+EMAIL_SEND_SECONDS = Histogram(
+    'email_send_duration_seconds', 'Time spent handing one outbox email to the SMTP server.', ('outcome',),
+    LATENCY_BUCKETS)
+
+REGISTRY = (REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, RENDER_SECONDS, RESPONSE_BYTES, EMAIL_SEND_SECONDS)
+
+
+def render_metrics():
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.reset()
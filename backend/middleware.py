@@ -0,0 +1,170 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+from .routers import SAFE_METHODS, RequestRouting, astick_to_primary, current_routing, stick_to_primary
+
+logger = logging.getLogger('backend.slow_requests')
+
+# The metrics of the request being handled. A context variable rather than a
+# thread-local so queries run through sync_to_async are still attributed.
+current_request_metrics = ContextVar('current_request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'db_seconds', 'render_seconds', 'sql')
+
+    def __init__(self, capture_sql):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = None
+        self.sql = [] if capture_sql else None
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that charges each query to the current request."""
+    request_metrics = current_request_metrics.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        request_metrics.queries += 1
+        request_metrics.db_seconds += elapsed
+        if request_metrics.sql is not None and len(request_metrics.sql) < settings.SLOW_REQUEST_SQL_LIMIT:
+            request_metrics.sql.append((elapsed, sql))
+
+
+def install_query_recorder(connection):
+    # Called on connection_created; the wrapper list outlives reconnects.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """
+    Record per-route latency, SQL count and time, render time and response
+    size into ``backend.metrics``, and log requests slower than
+    ``SLOW_REQUEST_MS`` together with the SQL they ran.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_seconds = settings.SLOW_REQUEST_MS / 1000 if settings.SLOW_REQUEST_MS else None
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request_metrics = RequestMetrics(self.slow_seconds is not None)
+        token = current_request_metrics.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.finish(request, response, request_metrics)
+        return response
+
+    async def __acall__(self, request):
+        request_metrics = RequestMetrics(self.slow_seconds is not None)
+        token = current_request_metrics.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        self.finish(request, response, request_metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        request_metrics = current_request_metrics.get()
+        if request_metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                request_metrics.render_seconds = time.perf_counter() - started
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, request_metrics):
+        elapsed = time.perf_counter() - request_metrics.started
+        match = request.resolver_match
+        labels = (request.method, match.route if match else 'unmatched', str(response.status_code))
+        metrics.REQUEST_SECONDS.observe(elapsed, *labels)
+        metrics.DB_QUERIES.observe(request_metrics.queries, *labels)
+        metrics.DB_SECONDS.observe(request_metrics.db_seconds, *labels)
+        if request_metrics.render_seconds is not None:
+            metrics.RENDER_SECONDS.observe(request_metrics.render_seconds, *labels)
+        if not response.streaming:
+            size = response.get('Content-Length')
+            metrics.RESPONSE_BYTES.observe(int(size) if size else len(response.content), *labels)
+
+        if self.slow_seconds is not None and elapsed >= self.slow_seconds:
+            logger.warning(
+                "Slow request %s %s -> %s in %.1f ms (%d queries, %.1f ms SQL)\n%s",
+                request.method, request.get_full_path(), response.status_code, elapsed * 1000,
+                request_metrics.queries, request_metrics.db_seconds * 1000,
+                '\n'.join(f'  [{seconds * 1000:.1f} ms] {sql}' for seconds, sql in request_metrics.sql),
+            )
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Give ``PrimaryReplicaRouter`` the request being handled, apply a view's
+    ``read_from`` override, and keep a user who wrote on the primary for the
+    next ``REPLICA_STICKY_SECONDS``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        routing = RequestRouting(request)
+        token = current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        if user_id := self.sticky_user(routing):
+            stick_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        routing = RequestRouting(request)
+        token = current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        if user_id := self.sticky_user(routing):
+            await astick_to_primary(user_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = current_routing.get()
+        # DRF's as_view() exposes the class as view_func.cls.
+        read_from = getattr(getattr(view_func, 'cls', view_func), 'read_from', None)
+        if routing is not None and read_from and request.method in SAFE_METHODS:
+            routing.read_from = read_from
+        return None
+
+    def sticky_user(self, routing):
+        return routing.user_id() if routing.wrote else None
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='registration_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='status',
+            field=models.CharField(choices=[('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted')], default='confirmed', max_length=10),
+        ),
+    ]
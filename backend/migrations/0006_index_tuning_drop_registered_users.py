@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def copy_registered_users(apps, schema_editor):
+    """Carry rows from the redundant Event.registered_users table into Registration."""
+    Event = apps.get_model('backend', 'Event')
+    Registration = apps.get_model('backend', 'Registration')
+    db = schema_editor.connection.alias
+    through = Event.registered_users.through
+
+    pairs = through.objects.using(db).values_list('customuser_id', 'event_id').iterator(chunk_size=5000)
+    batch = []
+    for user_id, event_id in pairs:
+        batch.append(Registration(user_id=user_id, event_id=event_id))
+        if len(batch) >= 5000:
+            Registration.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Registration.objects.using(db).bulk_create(batch, ignore_conflicts=True)
+
+    confirmed = (
+        Registration.objects.using(db).filter(event=OuterRef('pk'), status='confirmed')
+        .order_by().values('event').annotate(total=Count('pk')).values('total')
+    )
+    Event.objects.using(db).update(registration_count=Coalesce(Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('backend', '0005_event_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_registered_users, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='event',
+            name='registered_users',
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['email'], name='user_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['event', 'status', 'registered_at', 'id'], name='registration_event_status_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_events(apps, schema_editor):
+    from backend.search import CHUNK_SIZE, MAX_WEIGHT, event_terms
+
+    Event = apps.get_model('backend', 'Event')
+    SearchTerm = apps.get_model('backend', 'SearchTerm')
+    terms = []
+    for event in Event.objects.only('id', 'title', 'description', 'location').iterator(chunk_size=CHUNK_SIZE):
+        terms.extend(
+            SearchTerm(event_id=event.pk, term=term, weight=min(weight, MAX_WEIGHT))
+            for term, weight in event_terms(event).items()
+        )
+        if len(terms) >= CHUNK_SIZE:
+            SearchTerm.objects.bulk_create(terms)
+            terms = []
+    SearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_index_tuning_drop_registered_users'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='backend.event')),
+            ],
+            options={
+                'unique_together': {('term', 'event')},
+            },
+        ),
+        migrations.RunPython(index_existing_events, migrations.RunPython.noop),
+    ]
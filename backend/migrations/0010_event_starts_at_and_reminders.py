@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:05
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_starts_at(apps, schema_editor):
+    Event = apps.get_model('backend', 'Event')
+    tz = timezone.get_default_timezone()
+    batch = []
+    for event in Event.objects.only('id', 'date', 'time').iterator(chunk_size=1000):
+        event.starts_at = timezone.make_aware(datetime.datetime.combine(event.date, event.time), tz)
+        batch.append(event)
+        if len(batch) >= 1000:
+            Event.objects.bulk_update(batch, ['starts_at'])
+            batch = []
+    Event.objects.bulk_update(batch, ['starts_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_deletion_jobs'),
+    ]
+
+    operations = [
+        # Added nullable, backfilled from date + time, then made required.
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_starts_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='reminder_sent_for',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['starts_at', 'id'], name='event_starts_at_id_idx'),
+        ),
+    ]
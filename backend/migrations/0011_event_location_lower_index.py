@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:16
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_event_starts_at_and_reminders'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_location_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.text.Lower('location'), models.F('date'), models.F('time'), models.F('id'), name='event_location_lower_date_idx'),
+        ),
+    ]
@@ -1,8 +1,15 @@
 
-from django.db import models
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower, Now
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
+from .cache import invalidate_dashboards
+
 # Custom user model with role-based access
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
@@ -14,10 +21,54 @@ class CustomUser(AbstractUser):
     department = models.CharField(max_length=100, blank=True, null=True)  # Optional field
     year_of_study = models.CharField(max_length=4, blank=True, null=True)  # Optional field, e.g., "2023"
     college_name = models.CharField(max_length=255, blank=True, null=True)  # Optional field
+    updated_at = models.DateTimeField(auto_now=True)
+    registrations_version = models.PositiveIntegerField(default=0)  # Bumped whenever the user's registrations change
+    calendar_feed_version = models.PositiveIntegerField(default=0)  # Bumped to revoke the user's calendar feed links
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),  # Login/lookup by email
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+def confirmed_count():
+    # registration_count as it should be, for the event of the outer query.
+    confirmed = (
+        Registration.objects.filter(event=OuterRef('pk'), status=Registration.STATUS_CONFIRMED)
+        .order_by()
+        .values('event')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(confirmed), 0)
+
+class EventQuerySet(models.QuerySet):
+    def reconcile_registration_counts(self):
+        """Recompute ``registration_count`` from confirmed registrations in one UPDATE."""
+        return self.update(registration_count=confirmed_count(), updated_at=Now())
+
+    def with_drifted_registration_count(self):
+        """The events whose ``registration_count`` disagrees with their confirmed registrations."""
+        return self.alias(confirmed=confirmed_count()).exclude(registration_count=F('confirmed'))
+
+    # Bulk writes skip Event.save(), so they fill in starts_at themselves.
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for event in objs:
+            event.starts_at = event.compute_starts_at()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if {'date', 'time'} & set(fields):
+            objs = list(objs)
+            for event in objs:
+                event.starts_at = event.compute_starts_at()
+            fields = [*fields, 'starts_at']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
 # Event model created by a Coordinator
 class Event(models.Model):
     title = models.CharField(max_length=255)
@@ -26,20 +77,269 @@ class Event(models.Model):
     date = models.DateField()
     time = models.TimeField()
     coordinator = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='created_events')
+    capacity = models.PositiveIntegerField(blank=True, null=True)  # None means unlimited seats
+    registration_count = models.PositiveIntegerField(default=0)  # Confirmed registrations only
+    updated_at = models.DateTimeField(auto_now=True)  # Also bumped when registration_count changes
+    starts_at = models.DateTimeField(editable=False)  # date + time in TIME_ZONE, kept in sync by save() and bulk writes
 
-    registered_users = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='registered_events', blank=True)
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order for /api/events/ and its filtered variants.
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_id_idx'),
+            models.Index(fields=['coordinator', 'date', 'time', 'id'], name='event_coord_date_idx'),
+            # ?location= matches case-insensitively on LOWER(location).
+            models.Index(Lower('location'), 'date', 'time', 'id', name='event_location_lower_date_idx'),
+            # Covers the count/max(updated_at) validator of a coordinator's events.
+            models.Index(fields=['coordinator', 'updated_at'], name='event_coord_updated_idx'),
+            # Upcoming feed keyset and the reminder window's range scan.
+            models.Index(fields=['starts_at', 'id'], name='event_starts_at_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.starts_at = self.compute_starts_at()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'time'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'starts_at'}
+        super().save(*args, **kwargs)
+
+    def compute_starts_at(self):
+        return timezone.make_aware(datetime.combine(self.date, self.time), timezone.get_default_timezone())
+
+def bump_registrations_version(*user_ids):
+    # Invalidates the per-user validators of /api/events/registered/.
+    CustomUser.objects.filter(pk__in=user_ids).update(registrations_version=F('registrations_version') + 1)
+
+class AlreadyRegistered(Exception):
+    pass
+
+
+class NotRegistered(Exception):
+    pass
+
+
+class RegistrationManager(models.Manager):
+    def register(self, user, event):
+        """
+        Register ``user`` for ``event`` and return the new registration.
+
+        A seat is claimed with a single conditional UPDATE on the event's
+        counter and the row is inserted in the same transaction; the
+        ``unique_together`` constraint turns duplicate clicks into
+        ``AlreadyRegistered`` and rolls the seat claim back. When the event
+        is full the registration is stored as waitlisted instead.
+        """
+        try:
+            with transaction.atomic():
+                seated = Event.objects.filter(
+                    Q(capacity__isnull=True) | Q(registration_count__lt=F('capacity')),
+                    pk=event.pk,
+                ).update(registration_count=F('registration_count') + 1, updated_at=Now())
+                status = Registration.STATUS_CONFIRMED if seated else Registration.STATUS_WAITLISTED
+                registration = self.create(user=user, event=event, status=status)
+                bump_registrations_version(user.pk)
+                invalidate_dashboards(event.coordinator_id)
+                return registration
+        except IntegrityError:
+            raise AlreadyRegistered
+
+    def cancel(self, user, event):
+        """
+        Delete ``user``'s registration for ``event``.
+
+        A freed seat goes to the oldest waitlisted registrations, which are
+        returned so the caller can notify those participants.
+        """
+        with transaction.atomic():
+            # Lock the event row so concurrent cancels and registrations for
+            # the same event see a consistent counter and waitlist.
+            coordinator_ids = list(
+                Event.objects.select_for_update().filter(pk=event.pk).values_list('coordinator_id', flat=True)
+            )
+            registration = self.filter(user=user, event=event).first()
+            if registration is None:
+                raise NotRegistered
+            registration.delete()
+            bump_registrations_version(user.pk)
+            invalidate_dashboards(*coordinator_ids)
+            if registration.status != Registration.STATUS_CONFIRMED:
+                return []
+            Event.objects.filter(pk=event.pk).update(registration_count=F('registration_count') - 1, updated_at=Now())
+            return self.promote_waitlisted(event)
+
+    def promote_waitlisted(self, event):
+        """Confirm waitlisted registrations, oldest first, while seats are free."""
+        with transaction.atomic():
+            event = Event.objects.select_for_update().only('capacity', 'registration_count', 'coordinator_id').get(pk=event.pk)
+            waitlist = self.filter(event=event, status=Registration.STATUS_WAITLISTED).order_by('registered_at', 'id')
+            if event.capacity is not None:
+                free = event.capacity - event.registration_count
+                if free <= 0:
+                    return []
+                waitlist = waitlist[:free]
+            promoted = list(waitlist.select_related('user'))
+            if promoted:
+                self.filter(pk__in=[r.pk for r in promoted]).update(status=Registration.STATUS_CONFIRMED, updated_at=Now())
+                Event.objects.filter(pk=event.pk).update(
+                    registration_count=F('registration_count') + len(promoted), updated_at=Now(),
+                )
+                for registration in promoted:
+                    registration.status = Registration.STATUS_CONFIRMED
+                invalidate_dashboards(event.coordinator_id)
+            return promoted
+
+
 # Registration model linking Participant with an Event
 class Registration(models.Model):
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_WAITLISTED = 'waitlisted'
+    STATUS_CHOICES = (
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_WAITLISTED, 'Waitlisted'),
+    )
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registrations')
     registered_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_CONFIRMED)
+    updated_at = models.DateTimeField(auto_now=True)
+    # The event start a reminder was last sent for; a rescheduled event gets a new one.
+    reminder_sent_for = models.DateTimeField(blank=True, null=True)
+
+    objects = RegistrationManager()
 
     class Meta:
-        unique_together = ('user', 'event')  # Prevent duplicate registrations
+        unique_together = ('user', 'event')  # Prevent duplicate registrations; also serves lookups by user
+        indexes = [
+            # Participants, stats and waitlist promotion all filter on event
+            # (and status) and walk registrations in arrival order.
+            models.Index(fields=['event', 'status', 'registered_at', 'id'], name='registration_event_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.event.title}"
+
+# Transactional outbox for emails: views insert rows inside their own
+# transaction and the `send_queued_emails` worker delivers them over SMTP.
+class OutgoingEmailManager(models.Manager):
+    def queue(self, subject, message, recipient_list, from_email=None):
+        """Insert one pending row per recipient; no network I/O happens here."""
+        from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        return self.bulk_create([
+            self.model(subject=subject, message=message, from_email=from_email, recipient=recipient)
+            for recipient in recipient_list if recipient
+        ])
+
+    def queue_many(self, messages, from_email=None, batch_size=1000):
+        """Insert personalised ``(subject, message, recipient)`` rows in bulk."""
+        from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        return self.bulk_create(
+            [
+                self.model(subject=subject, message=message, from_email=from_email, recipient=recipient)
+                for subject, message, recipient in messages if recipient
+            ],
+            batch_size=batch_size,
+        )
+
+    def due(self, now=None):
+        return self.filter(
+            status=OutgoingEmail.STATUS_PENDING,
+            next_attempt_at__lte=now or timezone.now(),
+        ).order_by('next_attempt_at', 'id')
+
+
+class OutgoingEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def mark_failed(self, error, max_attempts, base_delay):
+        # Exponential backoff: base, 2x base, 4x base ... until max_attempts.
+        self.attempts += 1
+        self.last_error = str(error)[:1000]
+        if self.attempts >= max_attempts:
+            self.status = self.STATUS_FAILED
+        else:
+            self.next_attempt_at = timezone.now() + timedelta(seconds=base_delay * 2 ** (self.attempts - 1))
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
+
+
+class SearchTerm(models.Model):
+    # Inverted index over event text, maintained by backend.search.
+    term = models.CharField(max_length=64)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveSmallIntegerField()  # Field-weighted occurrence count
+
+    class Meta:
+        # (term, event) also serves exact and prefix lookups on term.
+        unique_together = ('term', 'event')
+
+    def __str__(self):
+        return f"{self.term} -> {self.event_id}"
+
+
+class DeletionJob(models.Model):
+    # Background deletion of a large user or event graph; see backend.deletion.
+    KIND_USER = 'user'
+    KIND_EVENT = 'event'
+    KIND_CHOICES = (
+        (KIND_USER, 'User'),
+        (KIND_EVENT, 'Event'),
+    )
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    target_id = models.BigIntegerField()  # Not a foreign key: the job outlives its target
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.PositiveIntegerField(default=0)  # Rows estimated when the job was queued
+    deleted = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Heartbeat while running
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='deletion_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"delete {self.kind} {self.target_id} ({self.status})"
@@ -0,0 +1,120 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering.
+
+    The cursor encodes the ordering values of the last row on the page, so
+    the next page is a ``WHERE (a, b, id) > (...) ORDER BY a, b, id LIMIT n``
+    range scan on a matching index instead of an OFFSET. Pagination is opt-in
+    unless ``optional`` is False: requests without ``cursor`` or ``page_size``
+    get the plain list as before.
+    """
+    ordering = ('date', 'time', 'id')
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    optional = True  # False: always paginate, even without query parameters
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self.set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request):
+        page = self.page_queryset(queryset, request)
+        if page is None:
+            return None
+        return self.set_page([row async for row in page])
+
+    def page_queryset(self, queryset, request):
+        # The unevaluated slice for the requested page plus one look-ahead row.
+        params = request.query_params
+        if self.optional and self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+        return queryset.order_by(*self.ordering)[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def keyset_filter(self, position):
+        # a >= x AND ((a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z))
+        # The OR alone is not sargable; the redundant leading bound lets the
+        # index seek to x instead of scanning from the start.
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            equal = {f: position[f] for f in self.ordering[:i]}
+            clauses.append(Q(**equal, **{f'{field}__gt': position[field]}))
+        first = self.ordering[0]
+        return Q(**{f'{first}__gte': position[first]}) & reduce(or_, clauses)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return {
+                field: model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            }
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        # Rows are model instances or values() dicts.
+        values = [str(row[field] if isinstance(row, dict) else getattr(row, field)) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,111 @@
+"""
+Primary/replica routing.
+
+With ``DATABASE_REPLICA`` naming a configured alias, reads made while
+handling a safe (GET/HEAD/OPTIONS) request go to the replica. Everything
+else reads from the primary: writes, unsafe requests, open transactions,
+code outside a request (commands, workers), and for ``REPLICA_STICKY_SECONDS``
+after a user's own writes, so they see them despite replication lag. Views
+override the choice with a ``read_from`` attribute of PRIMARY or REPLICA,
+and ``primary_reads()`` does so for a block, e.g. one filling a shared cache.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The routing state of the request being handled; a context variable so
+# queries run through sync_to_async see it, like the request metrics.
+current_routing = ContextVar('current_routing', default=None)
+
+
+def sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def stick_to_primary(user_id):
+    cache.set(sticky_key(user_id), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+async def astick_to_primary(user_id):
+    await cache.aset(sticky_key(user_id), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+@contextmanager
+def primary_reads():
+    # Payloads cached under a freshly bumped version are served to everyone
+    # until the next bump, so they must not come from a lagging replica.
+    routing = current_routing.get()
+    if routing is None:
+        yield
+        return
+    previous, routing.read_from = routing.read_from, PRIMARY
+    try:
+        yield
+    finally:
+        routing.read_from = previous
+
+
+class RequestRouting:
+    __slots__ = ('request', 'read_from', 'wrote', '_sticky')
+
+    def __init__(self, request):
+        self.request = request
+        self.read_from = None if request.method in SAFE_METHODS else PRIMARY
+        self.wrote = False
+        self._sticky = None
+
+    def user_id(self):
+        # Set once DRF has authenticated the request; reads before that are the
+        # auth lookup itself. The session middleware's lazy user is never
+        # evaluated here, as that would query (and route) from inside the router.
+        user = getattr(self.request, 'user', None)
+        if user is None or (isinstance(user, LazyObject) and user._wrapped is empty):
+            return None
+        return user.pk if user.is_authenticated else None
+
+    def reads_from_replica(self):
+        if self.read_from is not None:
+            return self.read_from == REPLICA
+        if self.wrote:
+            return False
+        user_id = self.user_id()
+        if user_id is None:
+            return True
+        if self._sticky is None:
+            self._sticky = cache.get(sticky_key(user_id)) is not None
+        return not self._sticky
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = replica_alias()
+        routing = current_routing.get()
+        if replica is None or routing is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica if routing.reads_from_replica() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
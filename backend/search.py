@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from collections import Counter
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Event, SearchTerm
+
+TOKEN_RE = re.compile(r'\w+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_WEIGHT = 32767
+# Matches in the title count more than in the location, then the description.
+FIELD_WEIGHTS = (('title', 3), ('location', 2), ('description', 1))
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the this to was were will with'.split()
+)
+INDEXED_FIELDS = frozenset(field for field, _ in FIELD_WEIGHTS)
+CHUNK_SIZE = 1000
+FREQUENCY_PROBE = 1000  # postings counted per term when choosing the rarest
+
+
+def fold(text):
+    # Case and accents dropped, as MySQL's default *_ai_ci collations compare
+    # them: "Café" and "cafe" must be one term, or (term, event) collides.
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    terms = []
+    for token in TOKEN_RE.findall(fold(text)):
+        if len(token) >= MIN_TERM_LENGTH and token not in STOPWORDS:
+            terms.append(token[:MAX_TERM_LENGTH])
+    return terms
+
+
+def event_terms(event):
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term in tokenize(getattr(event, field)):
+            weights[term] += weight
+    return weights
+
+
+def index_events(events):
+    """
+    Replace the search terms of ``events`` (saved instances), a chunk at a
+    time, so one call can index a bulk import or the whole table.
+    """
+    events = iter(events)
+    with transaction.atomic():
+        while chunk := list(islice(events, CHUNK_SIZE)):
+            SearchTerm.objects.filter(event_id__in=[event.pk for event in chunk]).delete()
+            SearchTerm.objects.bulk_create(
+                [
+                    SearchTerm(event_id=event.pk, term=term, weight=min(weight, MAX_WEIGHT))
+                    for event in chunk
+                    for term, weight in event_terms(event).items()
+                ],
+                batch_size=CHUNK_SIZE,
+                # Terms a collation still equates after folding (e.g. "ø" and
+                # "o") keep the first weight instead of failing the save.
+                ignore_conflicts=True,
+            )
+
+
+def unindexed_events(events=None):
+    # Events with no terms yet, e.g. after a bulk insert that returned no ids.
+    events = Event.objects.all() if events is None else events
+    return events.exclude(id__in=SearchTerm.objects.values('event_id'))
+
+
+def search_events(query, offset=0, limit=20):
+    """
+    Return ``(event_id, score)`` pairs for events containing every word of
+    ``query``, best match first. The score is the sum of the field weights.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    postings = SearchTerm.objects.filter(term__in=terms)
+    if len(terms) > 1:
+        # Only events holding the rarest word can match, so aggregate over
+        # its short posting list instead of every posting of common words.
+        frequency = {term: SearchTerm.objects.filter(term=term)[:FREQUENCY_PROBE].count() for term in terms}
+        rarest = min(terms, key=frequency.get)
+        postings = postings.filter(event_id__in=SearchTerm.objects.filter(term=rarest).values('event_id'))
+    rows = (
+        postings.values('event_id')
+        .annotate(score=Sum('weight'), matched=Count('term'))
+        .filter(matched=len(terms))
+        .order_by('-score', 'event_id')
+        .values_list('event_id', 'score')
+    )
+    return list(rows[offset:offset + limit])
+
+
+def suggest_terms(prefix, limit=10):
+    """
+    Autocomplete the last word being typed from the indexed vocabulary.
+
+    Each step seeks to the next distinct term on the (term, event) index, so
+    the cost is ``limit`` short lookups however many events share a term.
+    """
+    terms = tokenize(prefix)
+    if not terms:
+        return []
+    prefix, suggestions = terms[-1], []
+    after = SearchTerm.objects.filter(term__gte=prefix)
+    while len(suggestions) < limit:
+        term = after.order_by('term').values_list('term', flat=True).first()
+        if term is None or not term.startswith(prefix):
+            break
+        suggestions.append(term)
+        after = SearchTerm.objects.filter(term__gt=term)
+    return suggestions
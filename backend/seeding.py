@@ -0,0 +1,96 @@
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import Event, Registration
+from .search import index_events, unindexed_events
+
+User = get_user_model()
+
+DEPARTMENTS = ['CSE', 'ECE', 'EEE', 'ME', 'CE', 'IT']
+COLLEGES = ['GEC Thrissur', 'CET Trivandrum', 'MACE Kothamangalam', 'TKM Kollam']
+LOCATIONS = ['Main Hall', 'Seminar Hall', 'Auditorium', 'Lab Block', 'Open Air Theatre']
+WORDS = ['workshop', 'hackathon', 'seminar', 'robotics', 'music', 'quiz', 'python', 'design', 'startup', 'cloud']
+
+
+def seed(users=1000, events=100, registrations=10000, batch_size=5000, prefix='seed', seed_value=42, stdout=None):
+    """
+    Insert synthetic users, events and registrations with ``bulk_create``.
+
+    Every user shares one precomputed password hash ("password") so seeding
+    never runs the password hasher in a loop. Registrations are spread evenly
+    over events without duplicates; ``registrations`` may not exceed
+    ``users * events``. Returns ``(user_ids, event_ids)``.
+    """
+    if registrations > users * events:
+        raise ValueError("registrations cannot exceed users * events")
+    rng = random.Random(seed_value)
+    log = stdout.write if stdout else (lambda message: None)
+    password = make_password('password')
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{prefix}_user_{i}', email=f'{prefix}_user_{i}@example.com', password=password,
+                    role='coordinator' if i % 50 == 0 else 'participant',
+                    department=rng.choice(DEPARTMENTS), college_name=rng.choice(COLLEGES),
+                    year_of_study=str(rng.randint(2024, 2028)),
+                )
+                for i in range(users)
+            ),
+            batch_size=batch_size,
+        )
+    # Primary keys are re-read because not every backend returns them from bulk inserts.
+    user_ids = list(User.objects.filter(username__startswith=f'{prefix}_user_').order_by('id').values_list('id', flat=True))
+    coordinator_ids = user_ids[::50]
+    log(f"users: {len(user_ids)}\n")
+
+    start = datetime.date.today() - datetime.timedelta(days=365)
+    with transaction.atomic():
+        Event.objects.bulk_create(
+            (
+                Event(
+                    title=f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} #{i}',
+                    description=' '.join(rng.choice(WORDS) for _ in range(20)),
+                    location=rng.choice(LOCATIONS),
+                    date=start + datetime.timedelta(days=rng.randint(0, 730)),
+                    time=datetime.time(rng.randint(8, 20), rng.choice((0, 30))),
+                    coordinator_id=rng.choice(coordinator_ids),
+                )
+                for i in range(events)
+            ),
+            batch_size=batch_size,
+        )
+    event_ids = list(Event.objects.filter(coordinator_id__in=coordinator_ids).order_by('id').values_list('id', flat=True))
+    log(f"events: {len(event_ids)}\n")
+    index_events(unindexed_events(Event.objects.filter(coordinator_id__in=coordinator_ids)).iterator(chunk_size=batch_size))
+    log("search index: done\n")
+
+    # Pair i -> (user i % U, event (user * stride + i // U) % E): unique per
+    # user because i // U stays below E, and spread evenly across events.
+    stride = 7919
+    pairs = (
+        Registration(
+            user_id=user_ids[i % users],
+            event_id=event_ids[((i % users) * stride + i // users) % events],
+        )
+        for i in range(registrations)
+    )
+    created = 0
+    while True:
+        batch = [registration for _, registration in zip(range(batch_size), pairs)]
+        if not batch:
+            break
+        with transaction.atomic():
+            Registration.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+        if created % (batch_size * 20) == 0:
+            log(f"registrations: {created}\n")
+    log(f"registrations: {created}\n")
+
+    Event.objects.filter(pk__gte=event_ids[0]).reconcile_registration_counts()
+    return user_ids, event_ids
@@ -53,7 +53,16 @@ class EventSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = ['id', 'title', 'description', 'location', 'date', 'time', 'coordinator']
+        fields = ['id', 'title', 'description', 'location', 'date', 'time', 'capacity', 'registration_count', 'coordinator']
+        read_only_fields = ['registration_count']
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Write only the edited columns: a full save would put back the
+        # registration_count read before any registrations made since.
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
 
 # Participant info inside registration
 class RegistrationSerializer(serializers.ModelSerializer):
@@ -67,4 +76,49 @@ class RegistrationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Registration
-        fields = ['id', 'name', 'email', 'phone_number', 'department', 'year_of_study', 'college_name', 'event_title']
\ No newline at end of file
+        fields = ['id', 'name', 'email', 'phone_number', 'department', 'year_of_study', 'college_name', 'event_title']
+# ------------------- READ-ONLY FAST PATHS ------------------------
+# The same output as EventSerializer / RegistrationSerializer, built straight
+# from values() rows for large lists where per-field serializer work dominates.
+
+EVENT_VALUE_FIELDS = ['id', 'title', 'description', 'location', 'date', 'time', 'capacity', 'registration_count']
+REGISTRATION_VALUE_FIELDS = {
+    'id': 'id',
+    'name': 'user__username',
+    'email': 'user__email',
+    'phone_number': 'user__phone_number',
+    'department': 'user__department',
+    'year_of_study': 'user__year_of_study',
+    'college_name': 'user__college_name',
+    'event_title': 'event__title',
+}
+
+def event_values(queryset, prefix='', extra=()):
+    # ``prefix`` reaches the event through a relation, e.g. 'event__' on registrations;
+    # ``extra`` fields (e.g. a pagination key) are fetched but not rendered.
+    fields = EVENT_VALUE_FIELDS + [f'coordinator__{field}' for field in UserSerializer.Meta.fields] + list(extra)
+    return queryset.values(*(prefix + field for field in fields))
+
+def event_rows(rows, prefix=''):
+    coordinator = [(field, f'{prefix}coordinator__{field}') for field in UserSerializer.Meta.fields]
+    return [
+        {
+            'id': row[prefix + 'id'],
+            'title': row[prefix + 'title'],
+            'description': row[prefix + 'description'],
+            'location': row[prefix + 'location'],
+            'date': row[prefix + 'date'].isoformat(),
+            'time': row[prefix + 'time'].isoformat(),
+            'capacity': row[prefix + 'capacity'],
+            'registration_count': row[prefix + 'registration_count'],
+            'coordinator': {field: row[key] for field, key in coordinator},
+        }
+        for row in rows
+    ]
+
+def registration_values(queryset):
+    return queryset.values(*REGISTRATION_VALUE_FIELDS.values())
+
+def registration_rows(rows):
+    fields = REGISTRATION_VALUE_FIELDS.items()
+    return [{name: row[key] for name, key in fields} for row in rows]
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .ical import BLOCK_FIELDS, invalidate_blocks
+from .middleware import install_query_recorder
+from .models import Event
+from .search import INDEXED_FIELDS, index_events
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User, dispatch_uid='invalidate_cached_user')
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(connection_created, dispatch_uid='install_query_recorder')
+def record_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+@receiver(post_save, sender=Event, dispatch_uid='index_event')
+def index_event(sender, instance, update_fields=None, **kwargs):
+    # Search terms cascade away with the event; bulk_create callers index explicitly.
+    if update_fields is None or INDEXED_FIELDS & set(update_fields):
+        index_events([instance])
+
+
+@receiver([post_save, post_delete], sender=Event, dispatch_uid='invalidate_calendar_block')
+def drop_calendar_block(sender, instance, update_fields=None, **kwargs):
+    # Registration counter updates don't go through save(), so feeds keep their blocks.
+    if update_fields is None or set(BLOCK_FIELDS) & set(update_fields):
+        invalidate_blocks(instance.pk)
@@ -1,3 +1,1280 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import ScryptPasswordHasher, make_password
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.db import DatabaseError, connection, connections
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from eventmng import settings_lean
+
+from . import async_views
+from .checks import check_metrics_token, check_shared_cache
+from .mail import queue_event_reminders, send_pending_emails
+from .models import CustomUser, DeletionJob, Event, Registration, OutgoingEmail, SearchTerm
+from .idempotency import KEY_REUSED, fingerprint, lock_key, record_key
+from .metrics import reset_metrics
+from .middleware import DatabaseRoutingMiddleware
+from .pagination import KeysetPagination
+from .hashers import TunedScryptPasswordHasher
+from .renderers import FastJSONRenderer
+from .routers import PRIMARY, PrimaryReplicaRouter, sticky_key
+from .serializers import (
+    EventSerializer, RegistrationSerializer, event_rows, event_values, registration_rows, registration_values,
+)
+from .throttling import TokenBucket, reset_buckets
+from .views import filter_events
+
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def make_user(username, role='participant', **extra):
+    return CustomUser.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pass12345', role=role, **extra
+    )
+
+
+def make_event(coordinator, **extra):
+    fields = {
+        'title': 'Tech Fest',
+        'description': 'Annual fest',
+        'location': 'Main Hall',
+        'date': datetime.date(2030, 1, 1),
+        'time': datetime.time(10, 0),
+    }
+    fields.update(extra)
+    return Event.objects.create(coordinator=coordinator, **fields)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RegistrationEngineTests(TestCase):
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.event = make_event(self.coordinator, capacity=1)
+
+    def test_duplicate_registration_is_rejected(self):
+        client = client_for(make_user('alice'))
+        self.assertEqual(client.post(f'/api/events/{self.event.id}/register/').status_code, 201)
+        response = client.post(f'/api/events/{self.event.id}/register/')
+        self.assertEqual(response.status_code, 400)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def test_full_event_waitlists_and_cancel_promotes(self):
+        alice, bob = make_user('alice'), make_user('bob')
+        client_for(alice).post(f'/api/events/{self.event.id}/register/')
+        response = client_for(bob).post(f'/api/events/{self.event.id}/register/')
+        self.assertEqual(response.data['status'], Registration.STATUS_WAITLISTED)
+
+        self.assertEqual(client_for(alice).delete(f'/api/events/{self.event.id}/cancel/').status_code, 200)
+        self.assertEqual(Registration.objects.get(user=bob).status, Registration.STATUS_CONFIRMED)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+        self.assertTrue(OutgoingEmail.objects.filter(recipient=bob.email, subject='Event Registration Confirmed').exists())
+
+    def test_edit_keeps_registrations_made_since_the_event_was_read(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        Registration.objects.register(make_user('alice'), self.event)
+        serializer = EventSerializer(stale, data={'title': 'Renamed', 'capacity': 5}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.title, self.event.capacity, self.event.registration_count), ('Renamed', 5, 1))
+
+    def test_cancel_without_registration(self):
+        response = client_for(make_user('alice')).delete(f'/api/events/{self.event.id}/cancel/')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RegistrationConcurrencyTests(TransactionTestCase):
+    THREADS = 24
+    CAPACITY = 5
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise unittest.SkipTest("Concurrent writers need a file-backed or server database.")
+
+    def test_many_threads_hammering_one_event(self):
+        event = make_event(make_user('coord', role='coordinator'), capacity=self.CAPACITY)
+        users = [make_user(f'user{i}') for i in range(self.THREADS)]
+        barrier = threading.Barrier(self.THREADS * 2)
+        statuses = []
+        lock = threading.Lock()
+
+        def hammer(user):
+            try:
+                client = client_for(user)
+                barrier.wait()
+                response = client.post(f'/api/events/{event.id}/register/')
+                with lock:
+                    statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        # Every user double-clicks: two concurrent requests each.
+        threads = [threading.Thread(target=hammer, args=(user,)) for user in users for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuses), [201] * self.THREADS + [400] * self.THREADS)
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, self.CAPACITY)
+        self.assertEqual(event.registrations.filter(status=Registration.STATUS_CONFIRMED).count(), self.CAPACITY)
+        self.assertEqual(event.registrations.count(), self.THREADS)
+
+
+class OutboxDispatchTests(TestCase):
+    def setUp(self):
+        OutgoingEmail.objects.queue('Hello', 'Body', ['a@example.com', 'b@example.com'])
+
+    def rows(self):
+        return list(OutgoingEmail.objects.order_by('pk'))
+
+    def test_sends_and_marks_rows_sent(self):
+        self.assertEqual(send_pending_emails(), (2, 0))
+        self.assertEqual([message.to for message in mail.outbox], [['a@example.com'], ['b@example.com']])
+        for email in self.rows():
+            self.assertEqual((email.status, email.attempts), (OutgoingEmail.STATUS_SENT, 1))
+            self.assertIsNotNone(email.sent_at)
+        self.assertEqual(send_pending_emails(), (0, 0))
+
+    def test_rows_are_leased_while_sending(self):
+        # No transaction is held across SMTP, so other dispatchers must see
+        # the batch as not due rather than wait on its row locks.
+        def send(message):
+            self.assertFalse(OutgoingEmail.objects.due().exists())
+            return 1
+        with mock.patch('django.core.mail.EmailMessage.send', autospec=True, side_effect=send):
+            self.assertEqual(send_pending_emails(), (2, 0))
+
+    def test_failures_back_off_exponentially(self):
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('mailbox full')):
+            started = timezone.now()
+            self.assertEqual(send_pending_emails(base_delay=30), (0, 2))
+            email = self.rows()[0]
+            self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.STATUS_PENDING, 1, 'mailbox full'))
+            self.assertGreaterEqual(email.next_attempt_at, started + datetime.timedelta(seconds=30))
+            self.assertEqual(send_pending_emails(), (0, 0))  # not due yet
+
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+            started = timezone.now()
+            self.assertEqual(send_pending_emails(base_delay=30), (0, 2))
+            email = self.rows()[0]
+            self.assertEqual(email.attempts, 2)
+            self.assertGreaterEqual(email.next_attempt_at, started + datetime.timedelta(seconds=60))
+
+    def test_gives_up_after_max_attempts(self):
+        OutgoingEmail.objects.update(attempts=2)
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('rejected')):
+            self.assertEqual(send_pending_emails(max_attempts=3), (0, 2))
+        self.assertEqual({email.status for email in self.rows()}, {OutgoingEmail.STATUS_FAILED})
+        self.assertFalse(OutgoingEmail.objects.due().exists())
+
+    def test_connection_failure_backs_off_the_whole_batch(self):
+        smtp = mock.Mock(**{'open.side_effect': ConnectionRefusedError('no route')})
+        with mock.patch('backend.mail.get_connection', return_value=smtp):
+            self.assertEqual(send_pending_emails(), (0, 2))
+        self.assertEqual(mail.outbox, [])
+        for email in self.rows():
+            self.assertEqual((email.status, email.attempts, email.last_error), (OutgoingEmail.STATUS_PENDING, 1, 'no route'))
+        self.assertFalse(OutgoingEmail.objects.due().exists())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class QueryCountTests(TestCase):
+    """List endpoints must issue the same number of queries for 1 or 1000 rows."""
+
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.participant = make_user('alice', department='CSE', college_name='GEC', year_of_study='2025')
+        self.event = make_event(self.coordinator)
+
+    def seed(self, count):
+        events = Event.objects.bulk_create(
+            Event(
+                title=f'Event {i}', description='...', location='Hall', date=datetime.date(2030, 1, 1),
+                time=datetime.time(9, 0), coordinator=make_user(f'coord{i}', role='coordinator') if i < 5 else self.coordinator,
+            )
+            for i in range(count)
+        )
+        Registration.objects.bulk_create(Registration(user=self.participant, event=event) for event in events)
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f'p{i}', email=f'p{i}@example.com', role='participant') for i in range(count)
+        )
+        Registration.objects.bulk_create(Registration(user=user, event=self.event) for user in users)
+
+    def count_queries(self, user, url):
+        cache.clear()  # Measure the uncached path.
+        client = client_for(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant(self, user, url):
+        small = self.count_queries(user, url)
+        self.seed(1000)
+        self.assertEqual(self.count_queries(user, url), small)
+
+    def test_list_events(self):
+        self.assert_constant(self.participant, '/api/events/')
+
+    def test_coordinator_events(self):
+        self.assert_constant(self.coordinator, '/api/events/add/')
+
+    def test_my_events(self):
+        self.assert_constant(self.coordinator, '/api/events/my-events/')
+
+    def test_registered_events(self):
+        self.assert_constant(self.participant, '/api/events/registered/')
+
+    def test_event_participants(self):
+        self.assert_constant(self.coordinator, f'/api/participants/{self.event.id}/')
+
+    def test_coordinator_dashboard(self):
+        self.assert_constant(self.coordinator, '/api/events/dashboard/')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class EventListPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+        # Several events share date and time so the id tie-breaker matters.
+        for day in (3, 1, 2):
+            for hour in (9, 9, 14):
+                make_event(self.coordinator, date=datetime.date(2030, 1, day), time=datetime.time(hour, 0))
+
+    def test_walks_every_page_in_keyset_order(self):
+        seen, url = [], '/api/events/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 4)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        expected = list(Event.objects.order_by('date', 'time', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_unpaginated_request_keeps_plain_list(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(len(response.data), 9)
+
+    def test_filters(self):
+        other = make_user('other', role='coordinator')
+        make_event(other, location='Annex', date=datetime.date(2030, 1, 2))
+        response = self.client.get('/api/events/?date_from=2030-01-02&date_to=2030-01-02&page_size=50')
+        self.assertEqual(len(response.data['results']), 4)
+        response = self.client.get(f'/api/events/?coordinator={other.id}&location=annex')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(self.client.get('/api/events/?date_from=soon').status_code, 400)
+        self.assertEqual(self.client.get('/api/events/?cursor=garbage').status_code, 404)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite's")
+    def test_next_page_and_location_filter_seek_their_indexes(self):
+        pagination = KeysetPagination()
+        position = Event.objects.order_by(*pagination.ordering).values(*pagination.ordering)[4]
+        page = Event.objects.filter(pagination.keyset_filter(position)).order_by(*pagination.ordering)
+        self.assertIn('SEARCH backend_event USING INDEX event_date_time_id_idx (date>?)', page.explain())
+        self.assertEqual(len(page), 4)
+        located = filter_events(Event.objects.all(), {'location': 'main HALL'}).order_by(*pagination.ordering)
+        self.assertIn('SEARCH backend_event USING INDEX event_location_lower_date_idx', located.explain())
+        self.assertEqual(len(located), 9)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class EventCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+        self.event = make_event(self.coordinator)
+
+    def test_unchanged_list_is_served_from_cache_and_304(self):
+        first = self.client.get('/api/events/')
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/events/')
+            not_modified = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_writes_bump_list_and_detail_versions(self):
+        list_etag = self.client.get('/api/events/')['ETag']
+        detail_etag = self.client.get(f'/api/events/edit/{self.event.id}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/events/edit/{self.event.id}/', {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+
+        detail = self.client.get(f'/api/events/edit/{self.event.id}/', HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.data['title'], 'Renamed')
+        listing = self.client.get('/api/events/', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual(listing.data[0]['title'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/events/delete/{self.event.id}/')
+        self.assertEqual(self.client.get('/api/events/').data, [])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ParticipantExportTests(TestCase):
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.event = make_event(self.coordinator, title='Expo, "2030"')
+        for name in ('alice', 'bob'):
+            Registration.objects.create(user=make_user(name, department='CSE'), event=self.event)
+
+    def export(self, user, output):
+        return client_for(user).get(f'/api/participants/{self.event.id}/export/?output={output}')
+
+    def test_csv_matches_participants_endpoint(self):
+        response = self.export(self.coordinator, 'csv')
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        expected = client_for(self.coordinator).get(f'/api/participants/{self.event.id}/').data
+        self.assertEqual([row['email'] for row in rows], [row['email'] for row in expected])
+        self.assertEqual(rows[0]['event_title'], 'Expo, "2030"')
+
+    def test_csv_neutralises_formulas(self):
+        mallory = make_user('mallory', department='=HYPERLINK("http://evil.example")', phone_number='+1 555 0100')
+        Registration.objects.create(user=mallory, event=self.event)
+        self.event.title = '@SUM(A1)'
+        self.event.save(update_fields=['title'])
+        response = self.export(self.coordinator, 'csv')
+        row = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))[-1]
+        self.assertEqual(row['department'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual(row['phone_number'], "'+1 555 0100")
+        self.assertEqual(row['event_title'], "'@SUM(A1)")
+        self.assertEqual(row['name'], 'mallory')
+        # NDJSON is not opened by spreadsheets and keeps the values as stored.
+        lines = b''.join(self.export(self.coordinator, 'ndjson').streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[-1])['event_title'], '@SUM(A1)')
+
+    def test_ndjson(self):
+        response = self.export(self.coordinator, 'ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['alice', 'bob'])
+
+    async def test_streams_asynchronously_under_asgi(self):
+        # A sync iterator would be read into memory before the first byte is sent.
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.coordinator)}'}
+        response = await self.async_client.get(f'/api/participants/{self.event.id}/export/?output=ndjson', headers=headers)
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['alice', 'bob'])
+
+    def test_only_the_coordinator_can_export(self):
+        self.assertEqual(self.export(make_user('mallory'), 'csv').status_code, 404)
+        self.assertEqual(self.export(self.coordinator, 'xml').status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkTests(TestCase):
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+
+    def test_import_events_reports_each_row(self):
+        rows = [
+            {'title': 'A', 'description': 'd', 'location': 'Hall', 'date': '2030-02-01', 'time': '10:00'},
+            {'title': 'B', 'description': 'd', 'location': 'Hall', 'date': 'tomorrow', 'time': '10:00'},
+            {'title': 'C', 'description': 'd', 'location': 'Hall', 'date': '2030-02-02', 'time': '11:30', 'capacity': 3},
+        ]
+        response = self.client.post('/api/events/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['status'] for row in response.data['results']], ['created', 'error', 'created'])
+        self.assertIn('date', response.data['results'][1]['errors'])
+        self.assertEqual(Event.objects.filter(coordinator=self.coordinator).count(), 2)
+
+    def test_import_events_from_csv(self):
+        upload = io.BytesIO(b'title,description,location,date,time\nA,d,Hall,2030-02-01,10:00\n')
+        upload.name = 'events.csv'
+        response = self.client.post('/api/events/bulk/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['counts'], {'created': 1})
+
+    def test_enroll_respects_capacity_duplicates_and_ownership(self):
+        event = make_event(self.coordinator, capacity=1)
+        foreign = make_event(make_user('other', role='coordinator'))
+        alice, bob = make_user('alice'), make_user('bob')
+        Registration.objects.register(alice, event)
+        rows = [
+            {'username': 'alice', 'event': event.id},
+            {'username': 'bob', 'event': event.id},
+            {'username': 'bob', 'event': event.id},
+            {'username': 'ghost', 'event': event.id},
+            {'username': 'bob', 'event': foreign.id},
+        ]
+        response = self.client.post('/api/registrations/bulk/', rows, format='json')
+        self.assertEqual(
+            [row['status'] for row in response.data['results']],
+            ['duplicate', 'waitlisted', 'duplicate', 'error', 'error'],
+        )
+        event.refresh_from_db()
+        self.assertEqual(event.registration_count, 1)
+        self.assertEqual(Registration.objects.get(user=bob, event=event).status, Registration.STATUS_WAITLISTED)
+        self.assertEqual(OutgoingEmail.objects.filter(recipient=bob.email).count(), 1)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class RegistrationStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.event = make_event(self.coordinator, capacity=2)
+        for name, department in (('alice', 'CSE'), ('bob', 'CSE'), ('carol', 'ECE')):
+            Registration.objects.register(make_user(name, department=department, college_name='GEC'), self.event)
+
+    def test_stats_breakdown_in_one_aggregate(self):
+        client = client_for(self.coordinator)
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/events/{self.event.id}/stats/')
+        self.assertEqual(response.data['registration_count'], 2)
+        self.assertEqual(response.data['waitlisted'], 1)
+        self.assertEqual(response.data['by_department'], [{'value': 'CSE', 'count': 2}])
+        self.assertEqual(response.data['by_college_name'], [{'value': 'GEC', 'count': 2}])
+
+    def test_count_is_exposed_and_reconcilable(self):
+        client = client_for(self.coordinator)
+        etag = client.get(f'/api/events/edit/{self.event.id}/')['ETag']  # cached with the right count
+        Event.objects.filter(pk=self.event.pk).update(registration_count=42)
+        cache.clear()
+        self.assertEqual(client.get(f'/api/events/edit/{self.event.id}/').data['registration_count'], 42)
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_registration_counts', stdout=out)  # every event, no ids given
+        self.assertEqual(out.getvalue().strip(), 'Reconciled 1 event(s).')
+        response = client.get(f'/api/events/edit/{self.event.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.data['registration_count']), (200, 2))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UnifiedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('alice')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def test_cached_jwt_user_needs_no_queries(self):
+        self.assertEqual(self.client.get('/api/user/', **self.auth).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/user/', **self.auth)
+        self.assertEqual(response.data['username'], 'alice')
+
+    def test_cache_is_invalidated_on_save_and_delete(self):
+        self.client.get('/api/user/', **self.auth)
+        self.user.department = 'Physics'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/user/', **self.auth).data['department'], 'Physics')
+        self.assertEqual(self.client.delete('/api/delete-account/', **self.auth).status_code, 200)
+        self.assertEqual(self.client.get('/api/user/', **self.auth).status_code, 401)
+
+    def test_other_schemes(self):
+        token = Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get('/api/user/', HTTP_AUTHORIZATION=f'Token {token.key}').status_code, 200)
+        self.assertEqual(self.client.get('/api/user/', HTTP_AUTHORIZATION='Bearer nonsense').status_code, 401)
+        self.assertEqual(self.client.get('/api/user/').status_code, 401)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+
+
+TUNED_HASHERS = ['backend.hashers.TunedScryptPasswordHasher', 'backend.hashers.TunedPBKDF2PasswordHasher']
+
+
+@override_settings(
+    PASSWORD_HASHERS=TUNED_HASHERS,
+    PASSWORD_HASH_PARAMS={'scrypt_work_factor': 2 ** 10, 'pbkdf2_iterations': 1000},
+    LOGIN_RATE_LIMITS={'ip': (100, 1), 'username': (3, 0.01)},
+)
+class LoginProtectionTests(TestCase):
+    def setUp(self):
+        reset_buckets()
+
+    def login(self, username, password):
+        return self.client.post('/api/login/', {'username': username, 'password': password}, content_type='application/json')
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        user = make_user('alice')
+        user.password = make_password('pass12345', hasher='pbkdf2_sha256')
+        user.save()
+        self.assertEqual(self.login('alice', 'pass12345').status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$1024$'))
+
+    @override_settings(PASSWORD_HASH_PARAMS={})
+    def test_scrypt_defaults_match_django(self):
+        # A stock Django scrypt hash must not be rehashed with a cheaper policy.
+        stock = ScryptPasswordHasher()
+        tuned = TunedScryptPasswordHasher()
+        self.assertEqual(
+            (tuned.work_factor, tuned.block_size, tuned.parallelism),
+            (stock.work_factor, stock.block_size, stock.parallelism),
+        )
+        self.assertFalse(tuned.must_update(stock.encode('pass12345', stock.salt())))
+
+    def test_username_bucket_rejects_before_hashing(self):
+        make_user('alice')
+        for _ in range(3):
+            self.assertEqual(self.login('alice', 'wrong').status_code, 401)
+        with mock.patch('backend.hashers.TunedScryptPasswordHasher.verify') as verify:
+            response = self.login('alice', 'pass12345')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        verify.assert_not_called()
+        self.assertEqual(self.login('bob', 'wrong').status_code, 401)
+
+    @override_settings(LOGIN_RATE_LIMITS={'ip': (2, 0.01)})
+    def test_ip_bucket_uses_the_address_the_proxy_saw(self):
+        # Prepending addresses to X-Forwarded-For must not buy fresh buckets.
+        def login_via_proxy(forwarded_for):
+            return self.client.post(
+                '/api/login/', {'username': 'nobody', 'password': 'x'},
+                content_type='application/json', HTTP_X_FORWARDED_FOR=forwarded_for,
+            )
+        statuses = [login_via_proxy(f'10.0.0.{i}, 203.0.113.7').status_code for i in range(3)]
+        self.assertEqual(statuses, [401, 401, 429])
+        self.assertEqual(login_via_proxy('10.0.0.9, 203.0.113.8').status_code, 401)
+
+    def test_token_bucket_refills(self):
+        bucket = TokenBucket(burst=2, rate=1)
+        self.assertEqual([bucket.consume('k', now=0) for _ in range(3)][:2], [0, 0])
+        self.assertGreater(bucket.consume('k', now=0.5), 0)
+        self.assertEqual(bucket.consume('k', now=1.5), 0)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.user = make_user('alice', department='CSE')
+        self.event = make_event(self.coordinator)
+        Registration.objects.register(self.user, make_event(self.coordinator, title='Registered'))
+        self.factory = AsyncRequestFactory()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def sync_get(self, path):
+        return self.client.get(path, headers=self.headers)
+
+    async def test_reads_match_sync_views_byte_for_byte(self):
+        cases = [
+            (async_views.list_events, '/api/events/', ()),
+            (async_views.list_events, '/api/events/?page_size=1', ()),
+            (async_views.registered_events, '/api/events/registered/', ()),
+            (async_views.event_participants, f'/api/participants/{self.event.id}/', (self.event.id,)),
+        ]
+        for view, path, args in cases:
+            await cache.aclear()
+            expected = await sync_to_async(self.sync_get)(path)
+            await cache.aclear()
+            response = await view(self.factory.get(path, headers=self.headers), *args)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, expected.content, path)
+
+    async def test_register_and_auth_errors(self):
+        path = f'/api/events/{self.event.id}/register/'
+        response = await async_views.register_for_event(self.factory.post(path, headers=self.headers), self.event.id)
+        self.assertEqual(response.status_code, 201)
+        response = await async_views.register_for_event(self.factory.post(path, headers=self.headers), self.event.id)
+        self.assertEqual(json.loads(response.content), {'message': 'You have already registered for this event.'})
+        response = await async_views.register_for_event(self.factory.post(path), self.event.id)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        response = await async_views.registered_events(self.factory.post('/api/events/registered/', headers=self.headers))
+        self.assertEqual(response.status_code, 405)
+
+
+class HealthCheckTests(TestCase):
+    def test_health_reports_database_state(self):
+        client = APIClient()
+        response = client.get('/api/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'status': 'ok', 'database': 'ok'})
+        with mock.patch('backend.views.connection.cursor', side_effect=DatabaseError('down')):
+            response = client.get('/api/health/')
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_metrics()
+        self.user = make_user('coord', role='coordinator')
+        make_event(self.user)
+
+    @override_settings(DEBUG=True)
+    def test_route_metrics_are_exposed(self):
+        self.assertEqual(client_for(self.user).get('/api/events/').status_code, 200)
+        body = APIClient().get('/api/metrics/').content.decode()
+        labels = 'method="GET",route="api/events/",status="200"'
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', body)
+        self.assertIn(f'http_request_render_duration_seconds_count{{{labels}}} 1', body)
+        self.assertRegex(body, rf'http_request_db_queries_sum\{{{labels}\}} [1-9]')
+        self.assertRegex(body, rf'http_response_size_bytes_sum\{{{labels}\}} [1-9]')
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(APIClient().get('/api/metrics/').status_code, 401)
+        response = APIClient().get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_need_a_token_without_debug(self):
+        self.assertEqual(APIClient().get('/api/metrics/').status_code, 401)
+        self.assertEqual(APIClient().get('/api/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+        self.assertEqual([warning.id for warning in check_metrics_token(None)], ['backend.W001'])
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(check_metrics_token(None), [])
+
+    @override_settings(SLOW_REQUEST_MS=0.001)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('backend.slow_requests', 'WARNING') as logs:
+            client_for(self.user).get('/api/events/')
+        self.assertIn('SELECT', logs.output[0])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class EventSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+        self.hackathon = make_event(self.coordinator, title='Python Hackathon', description='Build with python')
+        self.workshop = make_event(self.coordinator, title='Robotics Workshop', description='Intro to python robots')
+        make_event(self.coordinator, title='Music Night', description='Live bands', location='Open Air Theatre')
+
+    def search(self, query):
+        response = self.client.get('/api/events/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [event['id'] for event in response.data['results']]
+
+    def test_results_match_every_word_and_are_ranked(self):
+        self.assertEqual(self.search('python'), [self.hackathon.id, self.workshop.id])
+        self.assertEqual(self.search('Python robots'), [self.workshop.id])
+        self.assertEqual(self.search('theatre'), [Event.objects.get(title='Music Night').id])
+        self.assertEqual(self.search('python music'), [])
+        self.assertEqual(self.client.get('/api/events/search/', {'q': 'the'}).status_code, 400)
+
+    def test_index_follows_edits_deletes_and_bulk_imports(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/events/edit/{self.workshop.id}/', {'title': 'Drone Workshop'}, format='json')
+        self.assertEqual(self.search('drone'), [self.workshop.id])
+        self.assertEqual(self.search('robotics'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/events/delete/{self.hackathon.id}/')
+        self.assertFalse(SearchTerm.objects.filter(event_id=self.hackathon.id).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/events/bulk/', [
+                {'title': 'Quantum Seminar', 'description': 'd', 'location': 'Hall', 'date': '2030-02-01', 'time': '10:00'},
+            ], format='json')
+        self.assertEqual(len(self.search('quantum')), 1)
+
+    def test_accented_and_plain_spellings_are_one_term(self):
+        # Separate rows would collide on (term, event) under accent-insensitive collations.
+        event = make_event(self.coordinator, title='Café Résumé Clinic', description='Bring your resume to the cafe')
+        terms = dict(SearchTerm.objects.filter(event=event).values_list('term', 'weight'))
+        self.assertEqual((terms['cafe'], terms['resume']), (4, 4))
+        self.assertNotIn('café', terms)
+        self.assertEqual(self.search('CAFÉ résume'), [event.id])
+
+    def test_pagination_and_suggestions(self):
+        response = self.client.get('/api/events/search/', {'q': 'python', 'page_size': 1})
+        self.assertEqual(response.data['results'][0]['id'], self.hackathon.id)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([event['id'] for event in response.data['results']], [self.workshop.id])
+        self.assertIsNone(response.data['next'])
+        response = self.client.get('/api/events/search/suggest/', {'q': 'live ro'})
+        self.assertEqual(response.data, {'suggestions': ['robotics', 'robots']})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class FastSerializationTests(TestCase):
+    def test_value_rows_render_like_the_serializers(self):
+        coordinator = make_user('coord', role='coordinator', phone_number=None, department='CSE')
+        event = make_event(coordinator, title='Caf\u00e9 \u2028 night', time=datetime.time(9, 30, 15), capacity=None)
+        make_event(coordinator, date=datetime.date(2031, 5, 6))
+        Registration.objects.register(make_user('alice', college_name='GEC'), event)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(EventSerializer(Event.objects.select_related('coordinator'), many=True).data),
+            renderer.render(event_rows(event_values(Event.objects.all()))),
+        )
+        registrations = Registration.objects.filter(event=event)
+        self.assertEqual(
+            renderer.render(RegistrationSerializer(registrations.select_related('user', 'event'), many=True).data),
+            renderer.render(registration_rows(registration_values(registrations))),
+        )
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'na\u00efve \u2028\u2029 "quoted" \U0001f600',
+            'when': datetime.datetime(2030, 1, 1, 10, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2030, 1, 1),
+            'time': datetime.time(10, 0, 5),
+            'error': [ErrorDetail('Invalid', code='invalid')],
+            'numbers': [1, 2.5, -3, None, True],
+            1: 'int key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2'),
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.participant = make_user('alice')
+        self.event = make_event(self.coordinator)
+        Registration.objects.register(self.participant, self.event)
+        self.participant.refresh_from_db()
+        self.coordinator.refresh_from_db()
+
+    def revalidate(self, client, path, etag, queries):
+        with self.assertNumQueries(queries):
+            response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+        return response.status_code
+
+    def test_user_detail_revalidates_without_queries(self):
+        client = client_for(self.participant)
+        response = client.get('/api/user/')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.revalidate(client, '/api/user/', response['ETag'], 0), 304)
+        response = client.get('/api/user/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.participant.department = 'ECE'
+        self.participant.save()
+        self.assertEqual(client_for(self.participant).get('/api/user/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_registered_events_change_with_registrations_and_events(self):
+        client = client_for(self.participant)
+        path = '/api/events/registered/'
+        etag = client.get(path)['ETag']
+        self.assertEqual(self.revalidate(client, path, etag, 1), 304)
+        # Someone else taking a seat changes registration_count in the payload.
+        Registration.objects.register(make_user('bob'), self.event)
+        self.assertEqual(self.revalidate(client, path, etag, 2), 200)
+        etag = client.get(path)['ETag']
+        Registration.objects.cancel(self.participant, self.event)
+        response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.data), (200, []))
+
+    def test_my_events_change_with_edits_and_deletes(self):
+        client = client_for(self.coordinator)
+        path = '/api/events/my-events/'
+        response = client.get(path)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+        self.assertEqual(self.revalidate(client, path, etag, 1), 304)
+        other = make_event(self.coordinator, title='Second')
+        self.assertEqual(self.revalidate(client, path, etag, 2), 200)
+        etag = client.get(path)['ETag']
+        other.delete()
+        self.assertEqual(self.revalidate(client, path, etag, 2), 200)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.participant = make_user('alice')
+        self.event = make_event(self.coordinator, title='Tech Fest, Day 1', description='Talks; demos\nand more')
+        Registration.objects.register(self.participant, self.event)
+        make_event(self.coordinator, title='Not registered')
+
+    def feed(self, user, kind='participant'):
+        url = client_for(user).get('/api/calendar/links/').data[kind]
+        response = APIClient().get(url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        return b''.join(response.streaming_content).decode()
+
+    def test_feeds_list_registered_and_coordinated_events(self):
+        body = self.feed(self.participant)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('SUMMARY:Tech Fest\\, Day 1\r\n', body)
+        self.assertIn('DESCRIPTION:Talks\\; demos\\nand more\r\n', body)
+        self.assertIn('DTSTART:20300101T043000Z\r\n', body)  # 10:00 Asia/Kolkata
+        self.assertNotIn('Not registered', body)
+        self.assertEqual(self.feed(self.coordinator, 'coordinator').count('BEGIN:VEVENT'), 2)
+        self.assertNotIn('coordinator', client_for(self.participant).get('/api/calendar/links/').data)
+        self.assertEqual(APIClient().get('/api/calendar/participant:1:forged.ics').status_code, 404)
+
+    def test_rotating_links_revokes_the_old_ones(self):
+        client = client_for(self.participant)
+        old = client.get('/api/calendar/links/').data['participant']
+        self.assertEqual(APIClient().get(old).status_code, 200)
+        new = client.post('/api/calendar/links/').data['participant']
+        self.assertNotEqual(new, old)
+        self.assertEqual(APIClient().get(old).status_code, 404)
+        self.assertEqual(APIClient().get(new).status_code, 200)
+        self.assertEqual(client.get('/api/calendar/links/').data['participant'], new)
+
+        self.participant.is_active = False
+        self.participant.save(update_fields=['is_active'])
+        self.assertEqual(APIClient().get(new).status_code, 404)
+
+    def test_blocks_are_cached_until_the_event_changes(self):
+        self.feed(self.participant)
+        url = client_for(self.participant).get('/api/calendar/links/').data['participant']
+        # The token's version check and the event ids; every block is cached.
+        with self.assertNumQueries(2):
+            b''.join(APIClient().get(url).streaming_content)
+        with self.captureOnCommitCallbacks(execute=True):
+            Registration.objects.register(make_user('bob'), self.event)
+        with self.assertNumQueries(2):
+            b''.join(APIClient().get(url).streaming_content)
+        with self.captureOnCommitCallbacks(execute=True):
+            client_for(self.coordinator).patch(f'/api/events/edit/{self.event.id}/', {'location': 'Auditorium'}, format='json')
+        self.assertIn('LOCATION:Auditorium', self.feed(self.participant))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class DeletionTests(TestCase):
+    def setUp(self):
+        self.coordinator = make_user('coord', role='coordinator')
+        self.event = make_event(self.coordinator, title='Robotics Expo', capacity=1)
+        self.alice, self.bob = make_user('alice'), make_user('bob')
+        Registration.objects.register(self.alice, self.event)
+        Registration.objects.register(self.bob, self.event)  # waitlisted
+
+    def cancellations(self):
+        return sorted(OutgoingEmail.objects.filter(subject='Event Cancelled').values_list('recipient', flat=True))
+
+    def test_small_event_is_deleted_inline_with_bulk_notices(self):
+        response = client_for(self.coordinator).delete(f'/api/events/delete/{self.event.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Event.objects.filter(pk=self.event.pk).exists())
+        self.assertFalse(SearchTerm.objects.filter(event_id=self.event.pk).exists())
+        self.assertEqual(self.cancellations(), ['alice@example.com', 'bob@example.com'])
+
+    @override_settings(DELETION_INLINE_ROWS=1)
+    def test_large_account_deletion_runs_as_a_job(self):
+        response = client_for(self.coordinator).delete('/api/delete-account/')
+        self.assertEqual(response.status_code, 202)
+        self.coordinator.refresh_from_db()
+        self.assertFalse(self.coordinator.is_active)
+        status_url = response.data['status_url']
+        self.assertEqual(APIClient().get(status_url).data['status'], DeletionJob.STATUS_PENDING)
+
+        call_command('process_deletions', batch_size=1, stdout=io.StringIO())
+        self.assertFalse(CustomUser.objects.filter(pk=self.coordinator.pk).exists())
+        self.assertFalse(Registration.objects.exists())
+        self.assertEqual(self.cancellations(), ['alice@example.com', 'bob@example.com'])
+        job = APIClient().get(status_url).data
+        self.assertEqual((job['status'], job['deleted']), (DeletionJob.STATUS_DONE, 4))
+        self.assertEqual(APIClient().get('/api/deletions/1:forged/').status_code, 404)
+
+    def test_participant_account_deletion_frees_their_seat(self):
+        self.assertEqual(client_for(self.alice).delete('/api/delete-account/').status_code, 200)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+        self.assertEqual(Registration.objects.get(user=self.bob).status, Registration.STATUS_CONFIRMED)
+        self.assertTrue(OutgoingEmail.objects.filter(recipient='bob@example.com', subject='Event Registration Confirmed').exists())
+
+    def test_participant_registrations_are_removed_in_batches(self):
+        events = [make_event(self.coordinator, title=f'Talk {i}', capacity=1) for i in range(30)]
+        for event in events:
+            Registration.objects.register(self.alice, event)
+        for event in events[:3]:
+            Registration.objects.register(self.bob, event)  # waitlisted behind alice
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client_for(self.alice).delete('/api/delete-account/').status_code, 200)
+        # One batch: read, lock, delete, one counter UPDATE, a promotion for
+        # each of the 4 waitlists, one notice INSERT; not ~13 per registration.
+        self.assertLess(len(queries), 60)
+        self.assertEqual(
+            list(Event.objects.filter(pk__in=[event.pk for event in events]).values_list('registration_count', flat=True)),
+            [1, 1, 1] + [0] * 27,
+        )
+        self.assertEqual(Registration.objects.filter(user=self.bob, status=Registration.STATUS_CONFIRMED).count(), 4)
+        self.assertEqual(OutgoingEmail.objects.filter(recipient=self.bob.email, subject='Event Registration Confirmed').count(), 4)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UpcomingEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+
+    def make_event_at(self, starts_at, **extra):
+        local = timezone.localtime(starts_at)
+        return make_event(self.coordinator, date=local.date(), time=local.time().replace(microsecond=0), **extra)
+
+    def test_starts_at_follows_date_and_time(self):
+        event = make_event(self.coordinator)
+        expected = timezone.make_aware(datetime.datetime(2030, 1, 1, 10, 0))
+        self.assertEqual(event.starts_at, expected)
+        event.time = datetime.time(18, 30)
+        event.save(update_fields=['time'])
+        event.refresh_from_db()
+        self.assertEqual(event.starts_at, expected.replace(hour=18, minute=30))
+
+        rows = [{'title': 'A', 'description': 'd', 'location': 'Hall', 'date': '2030-02-01', 'time': '09:15'}]
+        self.client.post('/api/events/bulk/', rows, format='json')
+        imported = Event.objects.get(title='A')
+        self.assertEqual(imported.starts_at, timezone.make_aware(datetime.datetime(2030, 2, 1, 9, 15)))
+
+    def test_upcoming_lists_future_events_soonest_first(self):
+        now = timezone.now()
+        self.make_event_at(now - datetime.timedelta(hours=2), title='Past')
+        later = self.make_event_at(now + datetime.timedelta(days=2), title='Later')
+        soon = self.make_event_at(now + datetime.timedelta(hours=3), title='Soon')
+        tied = self.make_event_at(soon.starts_at, title='Tied')
+
+        first = self.client.get('/api/events/upcoming/', {'page_size': 2}).data
+        self.assertEqual([row['id'] for row in first['results']], [soon.id, tied.id])
+        self.assertNotIn('starts_at', first['results'][0])
+        second = self.client.get(first['next']).data
+        self.assertEqual([row['id'] for row in second['results']], [later.id])
+        self.assertIsNone(second['next'])
+        # Paginated even without parameters.
+        self.assertEqual(len(self.client.get('/api/events/upcoming/').data['results']), 3)
+
+    def test_reminders_are_queued_once_per_start_time(self):
+        now = timezone.now()
+        event = self.make_event_at(now + datetime.timedelta(hours=5), capacity=2)
+        self.make_event_at(now + datetime.timedelta(days=3))  # outside the window
+        alice, bob, carol = make_user('alice'), make_user('bob'), make_user('carol')
+        for user in (alice, bob, carol):
+            Registration.objects.register(user, event)  # carol is waitlisted
+
+        def reminded():
+            return sorted(OutgoingEmail.objects.filter(subject='Event Reminder').values_list('recipient', flat=True))
+
+        self.assertEqual(queue_event_reminders(datetime.timedelta(hours=24), batch_size=1), (1, 2))
+        self.assertEqual(reminded(), ['alice@example.com', 'bob@example.com'])
+        call_command('send_event_reminders', hours=24, stdout=io.StringIO())
+        self.assertEqual(len(reminded()), 2)
+
+        # Rescheduling within the window earns a fresh reminder.
+        moved = timezone.localtime(event.starts_at + datetime.timedelta(minutes=30))
+        event.date, event.time = moved.date(), moved.time()
+        event.save(update_fields=['date', 'time'])
+        self.assertEqual(queue_event_reminders(datetime.timedelta(hours=24)), (1, 2))
+        self.assertEqual(len(reminded()), 4)
+
+
+@mock.patch('backend.routers.replica_alias', return_value='replica')
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.user = CustomUser(pk=7, username='alice')
+
+    def handle(self, method, user=None, write=False, view=None):
+        # A stand-in view that authenticates, maybe writes, then reports where it reads.
+        def respond(request):
+            if user is not None:
+                request.user = user
+            if write:
+                self.router.db_for_write(Event)
+            return HttpResponse(self.router.db_for_read(Event))
+
+        middleware = DatabaseRoutingMiddleware(
+            lambda request: middleware.process_view(request, view or respond, (), {}) or respond(request)
+        )
+        return middleware(getattr(RequestFactory(), method)('/api/events/')).content.decode()
+
+    def test_safe_reads_go_to_the_replica(self, replica_alias):
+        self.assertEqual(self.handle('get'), 'replica')
+        self.assertEqual(self.handle('get', self.user), 'replica')
+        self.assertEqual(self.handle('post', self.user), 'default')
+
+    def test_reads_stick_to_the_primary_after_a_write(self, replica_alias):
+        self.assertEqual(self.handle('post', self.user, write=True), 'default')
+        self.assertEqual(self.handle('get', self.user), 'default')
+        self.assertEqual(self.handle('get', CustomUser(pk=8, username='bob')), 'replica')
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            cache.clear()
+            self.assertEqual(self.handle('get', self.user), 'replica')
+
+    def test_view_override_and_reads_outside_requests(self, replica_alias):
+        view = type('View', (), {'read_from': PRIMARY})
+        self.assertEqual(self.handle('get', view=mock.Mock(cls=view)), 'default')
+        self.assertEqual(self.router.db_for_read(Event), 'default')
+        replica_alias.return_value = None
+        self.assertEqual(self.handle('get'), 'default')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, DATABASE_REPLICA='replica')
+class ReplicaDatabaseTests(TransactionTestCase):
+    # Two real SQLite databases. The replica holds its own copy of the event
+    # under another title, so each response shows which database served it.
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory)
+        replica = connections.configure_settings({
+            **settings.DATABASES,
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(directory, 'replica.sqlite3')},
+        })['replica']
+        cls.enterClassContext(mock.patch.dict(settings.DATABASES, {'replica': replica}))
+        cls.addClassCleanup(connections.__delitem__, 'replica')
+        cls.addClassCleanup(lambda: connections['replica'].close())
+        # The test runner only set up default; the replica alias exists from here on.
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(CustomUser)
+            editor.create_model(Event)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(self.clear_replica)
+        self.coordinator = make_user('coord', role='coordinator')
+        self.event = make_event(self.coordinator, title='Primary copy')
+        CustomUser.objects.using('replica').bulk_create([CustomUser(pk=self.coordinator.pk, username='coord', role='coordinator')])
+        Event.objects.using('replica').create(
+            pk=self.event.pk, title='Replica copy', description='', location='Main Hall',
+            date=self.event.date, time=self.event.time, coordinator_id=self.coordinator.pk,
+        )
+        self.client = client_for(self.coordinator)
+
+    def clear_replica(self):
+        # flush skips the replica: the router allows no migrations there.
+        with connections['replica'].cursor() as cursor:
+            for model in (Event, CustomUser):
+                cursor.execute(f'DELETE FROM {model._meta.db_table}')
+
+    def my_event_titles(self):
+        response = self.client.get('/api/events/my-events/')
+        self.assertEqual(response.status_code, 200)
+        return [event['title'] for event in response.data]
+
+    def test_reads_writes_and_sticky_reads_use_the_right_database(self):
+        self.assertIs(connections.settings, settings.DATABASES)  # the patched alias is live
+        self.assertEqual(self.my_event_titles(), ['Replica copy'])
+
+        response = self.client.patch(f'/api/events/edit/{self.event.pk}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Event.objects.using('default').get(pk=self.event.pk).title, 'Renamed')
+        self.assertEqual(Event.objects.using('replica').get(pk=self.event.pk).title, 'Replica copy')
+
+        # Right after the write the coordinator reads their own write ...
+        self.assertEqual(self.my_event_titles(), ['Renamed'])
+        # ... and back on the replica once the sticky window has passed.
+        cache.delete(sticky_key(self.coordinator.pk))
+        self.assertEqual(self.my_event_titles(), ['Replica copy'])
+
+    def test_cached_payloads_are_built_from_the_primary(self):
+        # Another user's read fills the cache under the version the edit
+        # bumped; a replica that hasn't caught up must not supply it.
+        participant = client_for(make_user('alice'))
+        self.assertEqual([event['title'] for event in participant.get('/api/events/').data], ['Primary copy'])
+        response = self.client.patch(f'/api/events/edit/{self.event.pk}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['title'] for event in participant.get('/api/events/').data], ['Renamed'])
+        self.assertEqual(participant.get(f'/api/events/edit/{self.event.pk}/').data['title'], 'Renamed')
+        # Uncached reads still go to the replica.
+        cache.delete(sticky_key(self.coordinator.pk))
+        self.assertEqual(self.my_event_titles(), ['Replica copy'])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, IDEMPOTENCY_ENABLED=True)
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = make_event(make_user('coord', role='coordinator'))
+        self.user = make_user('alice')
+        self.client = client_for(self.user)
+        self.register_url = f'/api/events/{self.event.id}/register/'
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.client.post(self.register_url, headers={'Idempotency-Key': 'k1'})
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(0):
+            retry = self.client.post(self.register_url, headers={'Idempotency-Key': 'k1'})
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Registration.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(OutgoingEmail.objects.filter(recipient=self.user.email).count(), 1)
+
+        # Without the key (or with a new one) the request runs again.
+        self.assertEqual(self.client.post(self.register_url, headers={'Idempotency-Key': 'k2'}).status_code, 400)
+        # Keys are per user and bound to the request they were first used for.
+        cancel_url = f'/api/events/{self.event.id}/cancel/'
+        self.assertEqual(self.client.delete(cancel_url, headers={'Idempotency-Key': 'k1'}).status_code, 422)
+        bob = client_for(make_user('bob'))
+        self.assertEqual(bob.post(self.register_url, headers={'Idempotency-Key': 'k1'}).status_code, 201)
+
+    def test_key_reused_with_a_different_body_is_rejected(self):
+        url = '/api/events/add/'
+        payload = {'title': 'Retry', 'description': 'd', 'location': 'Hall', 'date': '2030-03-01', 'time': '10:00'}
+        first = self.client.post(url, payload, format='json', headers={'Idempotency-Key': 'e'})
+        self.assertEqual(first.status_code, 201)
+        other = self.client.post(url, {**payload, 'title': 'Other'}, format='json', headers={'Idempotency-Key': 'e'})
+        self.assertEqual((other.status_code, other.data), (422, KEY_REUSED))
+        self.assertFalse(Event.objects.filter(title='Other').exists())
+
+    @override_settings(IDEMPOTENCY_ENABLED=False)
+    def test_header_is_ignored_without_a_shared_cache(self):
+        self.assertEqual(self.client.post(self.register_url, headers={'Idempotency-Key': 'k'}).status_code, 201)
+        retry = self.client.post(self.register_url, headers={'Idempotency-Key': 'k'})
+        self.assertEqual(retry.status_code, 400)
+        self.assertNotIn('Idempotent-Replayed', retry)
+
+    def test_cancel_and_add_event_retries(self):
+        Registration.objects.register(self.user, self.event)
+        cancel_url = f'/api/events/{self.event.id}/cancel/'
+        for _ in range(2):
+            self.assertEqual(self.client.delete(cancel_url, headers={'Idempotency-Key': 'c'}).status_code, 200)
+        self.assertEqual(OutgoingEmail.objects.filter(subject='Event Registration Cancelled').count(), 1)
+
+        payload = {'title': 'Retry', 'description': 'd', 'location': 'Hall', 'date': '2030-03-01', 'time': '10:00'}
+        ids = {self.client.post('/api/events/add/', payload, format='json', headers={'Idempotency-Key': 'e'}).data['id']
+               for _ in range(2)}
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(Event.objects.filter(title='Retry').count(), 1)
+
+    def test_concurrent_duplicate_waits_for_the_original(self):
+        record = record_key(self.user.pk, 'k')
+        cache.add(lock_key(record), 1)  # the original is still running
+
+        def finish():
+            cache.set(record, (fingerprint(APIRequestFactory().post(self.register_url)), 201, {'status': 'confirmed'}))
+            cache.delete(lock_key(record))
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        response = self.client.post(self.register_url, headers={'Idempotency-Key': 'k'})
+        timer.join()
+        self.assertEqual((response.status_code, response.data), (201, {'status': 'confirmed'}))
+        self.assertFalse(Registration.objects.exists())
+
+        cache.add(lock_key(record_key(self.user.pk, 'slow')), 1)
+        with override_settings(IDEMPOTENCY_WAIT=0):
+            response = self.client.post(self.register_url, headers={'Idempotency-Key': 'slow'})
+        self.assertEqual((response.status_code, response['Retry-After']), (409, '1'))
+
+    async def test_async_register_replays(self):
+        factory = AsyncRequestFactory()
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}', 'Idempotency-Key': 'a'}
+        first = await async_views.register_for_event(factory.post(self.register_url, headers=headers), self.event.id)
+        retry = await async_views.register_for_event(factory.post(self.register_url, headers=headers), self.event.id)
+        self.assertEqual((retry.status_code, retry.content), (201, first.content))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(await Registration.objects.filter(user=self.user).acount(), 1)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, MIDDLEWARE=settings_lean.MIDDLEWARE)
+class LeanSettingsTests(TestCase):
+    def test_profile_drops_cookie_auth_apps(self):
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'rest_framework.authtoken'):
+            self.assertNotIn(app, settings_lean.INSTALLED_APPS)
+        self.assertIn('backend', settings_lean.INSTALLED_APPS)
+
+    def test_jwt_flow_without_session_middleware(self):
+        user = make_user('alice')
+        event = make_event(make_user('coord', role='coordinator'))
+        response = self.client.post('/api/login/', {'username': 'alice', 'password': 'pass12345'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        headers = {'Authorization': f'Bearer {response.json()["access"]}'}
+        self.assertEqual(self.client.get('/api/user/', headers=headers).json()['username'], 'alice')
+        refreshed = self.client.post('/api/token/refresh/', {'refresh': response.json()['refresh']}, content_type='application/json')
+        self.assertIn('access', refreshed.json())
+        self.assertEqual(self.client.post(f'/api/events/{event.id}/register/', headers=headers).status_code, 201)
+        self.assertTrue(Registration.objects.filter(user=user).exists())
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        with override_settings(CACHE_SHARED=False):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['backend.E001'])
+        with override_settings(CACHE_SHARED=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CoordinatorDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coordinator = make_user('coord', role='coordinator')
+        self.client = client_for(self.coordinator)
+        self.event = make_event(self.coordinator, title='Hackathon', capacity=4)
+        self.empty = make_event(self.coordinator, title='Quiet', date=datetime.date(2030, 2, 1))
+        make_event(make_user('other', role='coordinator'))
+        self.alice = make_user('alice', department='CSE')
+        # carol signed up with a blank department, dan with none; erin and
+        # frank are waitlisted and stay out of the histograms.
+        for user in (
+            self.alice, make_user('bob', department='ECE'), make_user('carol', department=''), make_user('dan'),
+            make_user('erin', department='CSE'), make_user('frank', department='CSE'),
+        ):
+            Registration.objects.register(user, self.event)
+
+    def dashboard(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pass
+        response = self.client.get('/api/events/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counts_latest_and_histograms(self):
+        data = self.dashboard()
+        self.assertEqual([event['title'] for event in data['events']], ['Hackathon', 'Quiet'])
+        hackathon, quiet = data['events']
+        self.assertEqual((hackathon['confirmed'], hackathon['waitlisted']), (4, 2))
+        latest = Registration.objects.filter(event=self.event).latest('registered_at').registered_at
+        self.assertEqual(hackathon['latest_registration_at'], latest.isoformat())
+        self.assertEqual(hackathon['departments'], [
+            {'department': None, 'count': 2}, {'department': 'CSE', 'count': 1}, {'department': 'ECE', 'count': 1},
+        ])
+        self.assertEqual((quiet['confirmed'], quiet['latest_registration_at'], quiet['departments']), (0, None, []))
+        self.assertEqual(
+            {key: data['totals'][key] for key in ('events', 'confirmed', 'waitlisted')},
+            {'events': 2, 'confirmed': 4, 'waitlisted': 2},
+        )
+        self.assertEqual(data['totals']['departments'], hackathon['departments'])
+
+    def test_cached_until_registrations_change(self):
+        self.dashboard()
+        with self.assertNumQueries(0):
+            self.client.get('/api/events/dashboard/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.alice).delete(f'/api/events/{self.event.id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        hackathon = self.dashboard()['events'][0]
+        self.assertEqual((hackathon['confirmed'], hackathon['waitlisted']), (4, 1))
+        # erin took alice's seat: same CSE count, now from a confirmed registration.
+        self.assertIn({'department': 'CSE', 'count': 1}, hackathon['departments'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client_for(self.alice).post(f'/api/events/{self.empty.id}/register/')
+        self.assertEqual(self.dashboard()['events'][1]['confirmed'], 1)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucket:
+    """
+    In-process token bucket: ``burst`` requests at once, refilled at ``rate``
+    tokens per second. Idle keys are pruned so memory stays bounded.
+    """
+
+    def __init__(self, burst, rate, max_keys=100000):
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, now=None):
+        """Take one token for ``key``; return 0 if allowed, else seconds to wait."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self.buckets[key] = (tokens - 1, now)
+                if len(self.buckets) > self.max_keys:
+                    self.prune(now)
+                return 0
+            self.buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def prune(self, now):
+        # A bucket that has been idle long enough to refill is equivalent to a new one.
+        full_after = self.burst / self.rate
+        self.buckets = {key: value for key, value in self.buckets.items() if now - value[1] < full_after}
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(scope):
+    """Return the shared bucket for ``scope`` in LOGIN_RATE_LIMITS, or None if unlimited."""
+    limits = getattr(settings, 'LOGIN_RATE_LIMITS', None) or {}
+    if scope not in limits:
+        return None
+    burst, rate = limits[scope]
+    with _buckets_lock:
+        bucket = _buckets.get(scope)
+        if bucket is None or (bucket.burst, bucket.rate) != (burst, rate):
+            bucket = _buckets[scope] = TokenBucket(burst, rate)
+    return bucket
+
+
+def reset_buckets():
+    with _buckets_lock:
+        _buckets.clear()
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    Per-IP and per-username token buckets for login endpoints.
+
+    DRF checks throttles before the view runs, so a rejected login never
+    reaches the password hasher.
+    """
+
+    def allow_request(self, request, view):
+        self.delay = 0
+        checks = [('ip', self.get_ident(request))]
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if username:
+            checks.append(('username', str(username).lower()))
+        for scope, key in checks:
+            bucket = get_bucket(scope)
+            if bucket is not None:
+                self.delay = max(self.delay, bucket.consume(key))
+        return self.delay == 0
+
+    def wait(self):
+        return self.delay
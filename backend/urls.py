@@ -1,36 +1,85 @@
 
+from django.conf import settings
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 from .views import (
-    RegisterView, LoginView,
+    RegisterView, LoginView, HealthCheckView, MetricsView,
     AddEventView, ListEventView,
     EditEventView, DeleteEventView, UserDetailView,
     register_for_event, CancelRegistrationView,
-    LogoutView, DeleteAccountView, MyEventsView, registered_events, EditEventView, EventParticipantsView
+    LogoutView, DeleteAccountView, MyEventsView, CoordinatorDashboardView, registered_events, EditEventView, EventParticipantsView,
+    EventParticipantsExportView, BulkEventImportView, BulkRegistrationView, EventStatsView,
+    EventSearchView, EventSuggestView, UpcomingEventsView, CalendarFeedLinksView, CalendarFeedView, DeletionStatusView,
 )
 
+def lazy_view(dotted_path, **initkwargs):
+    # Imports the view class on its first request rather than at URLconf load.
+    view = None
+
+    @csrf_exempt
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+    return dispatch
+
+token_obtain_pair_view = lazy_view('backend.jwt_views.ThrottledTokenObtainPairView')
+token_refresh_view = lazy_view('rest_framework_simplejwt.views.TokenRefreshView')
+
+list_events_view = ListEventView.as_view()
+event_participants_view = EventParticipantsView.as_view()
+register_for_event_view = register_for_event
+registered_events_view = registered_events
+
+# ASGI deployments can serve the hottest endpoints from async views with the same URLs.
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    list_events_view = async_views.list_events
+    event_participants_view = async_views.event_participants
+    register_for_event_view = async_views.register_for_event
+    registered_events_view = async_views.registered_events
+
 urlpatterns = [
     # Auth
     path('register/', RegisterView.as_view(), name='register'),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('login/', token_obtain_pair_view, name='token_obtain_pair'),
+    path('token/refresh/', token_refresh_view, name='token_refresh'),
     path('user/', UserDetailView.as_view(), name='user-detail'),
 
     # Events (Coordinator)
     path('events/add/', AddEventView.as_view(), name='add-event'),
-    path('events/', ListEventView.as_view(), name='list-events'),
+    path('events/dashboard/', CoordinatorDashboardView.as_view(), name='coordinator-dashboard'),
+    path('events/bulk/', BulkEventImportView.as_view(), name='bulk-add-events'),
+    path('registrations/bulk/', BulkRegistrationView.as_view(), name='bulk-register'),
+    path('events/', list_events_view, name='list-events'),
+    path('events/upcoming/', UpcomingEventsView.as_view(), name='upcoming-events'),
+    path('events/search/', EventSearchView.as_view(), name='search-events'),
+    path('events/search/suggest/', EventSuggestView.as_view(), name='suggest-search-terms'),
     path('events/edit/<int:pk>/', EditEventView.as_view(), name='edit-event'),
     path('events/delete/<int:pk>/', DeleteEventView.as_view(), name='delete-event'),
-    path('participants/<int:event_id>/', EventParticipantsView.as_view(), name='event-participants'),  # Removed 'api/' prefix
+    path('participants/<int:event_id>/', event_participants_view, name='event-participants'),  # Removed 'api/' prefix
+    path('participants/<int:event_id>/export/', EventParticipantsExportView.as_view(), name='event-participants-export'),
 
     # Events (Participant)
-    path('events/<int:event_id>/register/', register_for_event, name='register-event'),
+    path('events/<int:event_id>/register/', register_for_event_view, name='register-event'),
     path('events/<int:event_id>/cancel/', CancelRegistrationView.as_view(), name='cancel-registration'),
-    path('events/registered/', registered_events, name='registered-events'),
+    path('events/<int:event_id>/stats/', EventStatsView.as_view(), name='event-stats'),
+    path('events/registered/', registered_events_view, name='registered-events'),
+
+    # Calendar feeds
+    path('calendar/links/', CalendarFeedLinksView.as_view(), name='calendar-links'),
+    path('calendar/<str:token>.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+
+    # Health and metrics
+    path('health/', HealthCheckView.as_view(), name='health'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 
     # Account Management
     path('logout/', LogoutView.as_view(), name='logout'),
     path('delete-account/', DeleteAccountView.as_view(), name='delete-account'),
+    path('deletions/<str:token>/', DeletionStatusView.as_view(), name='deletion-status'),
 
     # Event History View (Participant)
     path('events/my-events/', MyEventsView.as_view(), name='my-events'),
@@ -1,20 +1,55 @@
 
+import time
+from collections import Counter
+
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
 from django.contrib.auth import login
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Event, Registration
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Event, Registration, OutgoingEmail, DeletionJob, AlreadyRegistered, NotRegistered
+from .bulk import BulkInputError, enroll, import_events, read_rows, summarize
+from .cache import (
+    EVENT_LIST_VERSION_KEY, cached_response, conditional_response, dashboard_version_key, event_version_key, get_version,
+    invalidate_dashboards, invalidate_events,
+    versioned_key,
+)
+from .deletion import (
+    delete_event, delete_user, event_graph_size, inline_limit, job_token, queue_deletion, read_job_token,
+    user_graph_size,
+)
+from .exports import stream_csv, stream_ndjson, streaming_response
+from .idempotency import idempotent
+from .ical import feed_token, read_feed_token, stream_feed
+from .mail import queue_promotion_emails
+from .metrics import render_metrics
+from .pagination import KeysetPagination
+from .routers import PRIMARY
+from .search import search_events, suggest_terms, tokenize
+from .throttling import LoginRateThrottle
 from .serializers import (
     EventSerializer,
-    RegistrationSerializer,
     RegisterSerializer,
     LoginSerializer,
     UserSerializer,
+    event_rows,
+    event_values,
+    registration_rows,
+    registration_values,
 )
 
 User = get_user_model()
@@ -26,6 +61,8 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 class LoginView(APIView):
+    throttle_classes = [LoginRateThrottle]
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -44,8 +81,13 @@ class UserDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data)
+        # The cached request.user is dropped on every save, so its
+        # updated_at answers a revalidation without touching the database.
+        user = request.user
+        return conditional_response(
+            request, f'user:{user.pk}:{user.updated_at.isoformat()}', lambda: UserSerializer(user).data,
+            last_modified=user.updated_at, max_age=settings.USER_DETAIL_MAX_AGE,
+        )
 
 class DeleteAccountView(APIView):
     permission_classes = [IsAuthenticated]
@@ -53,130 +95,550 @@ class DeleteAccountView(APIView):
     def delete(self, request):
         user = request.user
         username = user.username
-        user.delete()
+        size = user_graph_size(user.pk)
+        if size > inline_limit():
+            # Too big for one request: lock the account now, delete in the background.
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            job = queue_deletion(DeletionJob.KIND_USER, user.pk, size)
+            return Response(deletion_queued_data(request, job), status=status.HTTP_202_ACCEPTED)
+        delete_user(user.pk)
         return Response({"message": f"User '{username}' deleted successfully."}, status=200)
 
+class DeletionStatusView(APIView):
+    # Reachable by token because a deleted account can no longer authenticate.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    read_from = PRIMARY  # Anonymous, so not sticky; polled right after the job is created.
+
+    def get(self, request, token):
+        job = DeletionJob.objects.filter(pk=read_job_token(token)).first()
+        if job is None:
+            return Response({'error': 'Unknown deletion job.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'kind': job.kind,
+            'status': job.status,
+            'deleted': job.deleted,
+            'total': job.total,
+            'error': job.last_error,
+            'created_at': job.created_at,
+            'finished_at': job.finished_at,
+        })
+
+def deletion_queued_data(request, job):
+    token = job_token(job)
+    return {
+        'message': 'Deletion queued.',
+        'job': token,
+        'status_url': request.build_absolute_uri(f'/api/deletions/{token}/'),
+    }
+
+class HealthCheckView(APIView):
+    # Unauthenticated liveness probe that also proves the database answers.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return Response({'status': 'error', 'database': 'unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'status': 'ok', 'database': 'ok'})
+
+class MetricsView(APIView):
+    # Prometheus scrape target for the counters kept by MetricsMiddleware.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        # Anonymous scrapes are for local DEBUG runs only; without a token a
+        # deployment serves nobody its traffic, latency and status mix.
+        if settings.METRICS_TOKEN or not settings.DEBUG:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+            if not settings.METRICS_TOKEN or not constant_time_compare(supplied, settings.METRICS_TOKEN):
+                return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # ------------------- EVENT VIEWS ------------------------
 
 class AddEventView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         serializer = EventSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(coordinator=request.user)
+            event = serializer.save(coordinator=request.user)
+            invalidate_events(event.pk)
+            invalidate_dashboards(request.user.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request):
-        events = Event.objects.filter(coordinator=request.user)
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data)
+        return coordinator_events_response(request)
+
+class BulkEventImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # JSON array of events or a CSV upload with the same columns.
+        started = time.perf_counter()
+        try:
+            rows = read_rows(request)
+        except BulkInputError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        results, events = import_events(rows, request.user)
+        if events:
+            invalidate_events()
+            invalidate_dashboards(request.user.pk)
+        summary = summarize(results, time.perf_counter() - started)
+        return Response(summary, status=status.HTTP_201_CREATED if events else status.HTTP_400_BAD_REQUEST)
 
 class ListEventView(generics.ListAPIView):
-    queryset = Event.objects.all()
+    queryset = Event.objects.select_related('coordinator')
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        # The date is part of the key because ?upcoming=1 depends on it.
+        key = versioned_key(
+            'events:list', get_version(EVENT_LIST_VERSION_KEY),
+            request.build_absolute_uri(), timezone.localdate(),
+        )
+        return cached_response(request, key, lambda: self.build_list(request))
+
+    def build_list(self, request):
+        # values() rows instead of model instances + EventSerializer; same JSON.
+        rows = event_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(event_rows(page)).data
+        return event_rows(rows)
+
+    def get_queryset(self):
+        return filter_events(super().get_queryset(), self.request.query_params)
+
+def filter_events(events, params):
+    # Optional server-side filters: ?date_from=&date_to=&location=&coordinator=&upcoming=1
+    date_from = parse_date_param(params, 'date_from')
+    if params.get('upcoming') in ('1', 'true'):
+        today = timezone.localdate()
+        date_from = max(date_from, today) if date_from else today
+    if date_from:
+        events = events.filter(date__gte=date_from)
+    date_to = parse_date_param(params, 'date_to')
+    if date_to:
+        events = events.filter(date__lte=date_to)
+    if params.get('location'):
+        # The same expression as event_location_lower_date_idx, unlike iexact.
+        events = events.filter(Exact(Lower('location'), Lower(Value(params['location']))))
+    if params.get('coordinator'):
+        try:
+            events = events.filter(coordinator_id=int(params['coordinator']))
+        except ValueError:
+            raise ValidationError({'coordinator': 'Expected a user id.'})
+    return events
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Expected a date in YYYY-MM-DD format.'})
+    return parsed
+
+class UpcomingPagination(KeysetPagination):
+    ordering = ('starts_at', 'id')
+    optional = False
+
+class UpcomingEventsView(generics.ListAPIView):
+    # Events that haven't started yet, soonest first: a range scan on (starts_at, id).
+    permission_classes = [IsAuthenticated]
+    pagination_class = UpcomingPagination
+
+    def list(self, request, *args, **kwargs):
+        # Keyed to the minute so the window moves without a cache bypass.
+        now = timezone.now().replace(second=0, microsecond=0)
+        key = versioned_key('events:upcoming', get_version(EVENT_LIST_VERSION_KEY), request.build_absolute_uri(), now)
+        return cached_response(request, key, lambda: self.build_list(now))
+
+    def build_list(self, now):
+        rows = event_values(Event.objects.filter(starts_at__gte=now), extra=UpcomingPagination.ordering)
+        return self.get_paginated_response(event_rows(self.paginate_queryset(rows))).data
+
+class EventSearchView(APIView):
+    # ?q=words&page=&page_size= ; every word must match, best score first.
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not tokenize(query):
+            raise ValidationError({'q': 'Enter at least one word to search for.'})
+        page = positive_int_param(request.query_params, 'page', 1)
+        page_size = min(positive_int_param(request.query_params, 'page_size', self.page_size), self.max_page_size)
+        key = versioned_key('events:search', get_version(EVENT_LIST_VERSION_KEY), request.build_absolute_uri())
+        return cached_response(request, key, lambda: self.search(request, query, page, page_size))
+
+    def search(self, request, query, page, page_size):
+        # One look-ahead row tells whether there is a next page.
+        matches = search_events(query, offset=(page - 1) * page_size, limit=page_size + 1)
+        ids = [event_id for event_id, _ in matches[:page_size]]
+        events = {event['id']: event for event in event_rows(event_values(Event.objects.filter(id__in=ids)))}
+        next_link = None
+        if len(matches) > page_size:
+            next_link = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return {
+            'next': next_link,
+            'results': [events[pk] for pk in ids if pk in events],
+        }
+
+class EventSuggestView(APIView):
+    # ?q=partial word -> indexed words starting with it, for autocomplete.
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'suggestions': suggest_terms(request.query_params.get('q', ''))})
+
+def positive_int_param(params, name, default):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ValidationError({name: 'Expected a positive integer.'})
+    if value < 1:
+        raise ValidationError({name: 'Expected a positive integer.'})
+    return value
 
 class EditEventView(generics.RetrieveUpdateAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        key = versioned_key('events:detail', get_version(event_version_key(pk)), pk)
+        return cached_response(request, key, lambda: super(EditEventView, self).retrieve(request, *args, **kwargs).data)
+
     def perform_update(self, serializer):
         if self.request.user != serializer.instance.coordinator:
             raise PermissionError("Only the event coordinator can update this event.")
-        serializer.save()
+        with transaction.atomic():
+            event = serializer.save()
+            # A raised capacity frees seats for the waitlist.
+            queue_promotion_emails(event, Registration.objects.promote_waitlisted(event))
+            invalidate_events(event.pk)
+            invalidate_dashboards(event.coordinator_id)
 
 class DeleteEventView(APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, pk):
-        try:
-            event = Event.objects.get(pk=pk, coordinator=request.user)
-            event.delete()
-            return Response({'message': 'Event deleted'}, status=status.HTTP_204_NO_CONTENT)
-        except Event.DoesNotExist:
+        if not Event.objects.filter(pk=pk, coordinator=request.user).exists():
             return Response({'error': 'Event not found or not authorized'}, status=status.HTTP_404_NOT_FOUND)
+        size = event_graph_size(pk)
+        if size > inline_limit():
+            job = queue_deletion(DeletionJob.KIND_EVENT, pk, size)
+            return Response(deletion_queued_data(request, job), status=status.HTTP_202_ACCEPTED)
+        delete_event(pk)
+        return Response({'message': 'Event deleted'}, status=status.HTTP_204_NO_CONTENT)
 
 class MyEventsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        events = Event.objects.filter(coordinator=request.user)
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data)
+        return coordinator_events_response(request)
+
+def coordinator_events_response(request):
+    # Count and newest updated_at come off the (coordinator, updated_at) index.
+    events = Event.objects.filter(coordinator=request.user)
+    state = events.aggregate(count=Count('id'), latest=Max('updated_at'))
+    validator = f"my-events:{request.user.pk}:{request.user.updated_at.isoformat()}:{state['count']}:{state['latest']}"
+    return conditional_response(request, validator, lambda: event_rows(event_values(events)))
+
+class CoordinatorDashboardView(APIView):
+    # Everything the coordinator dashboard shows, in three grouped queries
+    # however many events there are; cached until a registration changes.
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_id = request.user.pk
+        key = versioned_key('dashboard', get_version(dashboard_version_key(user_id)), user_id)
+        return cached_response(request, key, lambda: coordinator_dashboard(user_id))
+
+def coordinator_dashboard(coordinator_id):
+    events = list(
+        Event.objects.filter(coordinator_id=coordinator_id).order_by('date', 'time', 'id')
+        .values('id', 'title', 'location', 'date', 'time', 'capacity')
+    )
+    registrations = Registration.objects.filter(event__coordinator_id=coordinator_id).order_by()
+    by_status = registrations.values_list('event_id', 'status').annotate(count=Count('id'), latest=Max('registered_at'))
+    # Like EventStatsView: confirmed seats only, with blank departments counted as null.
+    by_department = (
+        registrations.filter(status=Registration.STATUS_CONFIRMED)
+        .values_list('event_id', 'user__department').annotate(count=Count('id'))
+    )
+
+    stats = {event['id']: {'confirmed': 0, 'waitlisted': 0, 'latest': None, 'departments': Counter()} for event in events}
+    for event_id, registration_status, count, latest in by_status:
+        entry = stats[event_id]
+        entry[registration_status] = count
+        entry['latest'] = max(entry['latest'], latest) if entry['latest'] else latest
+    for event_id, department, count in by_department:
+        stats[event_id]['departments'][department or None] += count
+
+    totals = {'events': len(events), 'confirmed': 0, 'waitlisted': 0, 'departments': Counter()}
+    rows = []
+    for event in events:
+        entry = stats[event['id']]
+        totals['confirmed'] += entry['confirmed']
+        totals['waitlisted'] += entry['waitlisted']
+        totals['departments'].update(entry['departments'])
+        rows.append({
+            'id': event['id'],
+            'title': event['title'],
+            'location': event['location'],
+            'date': event['date'].isoformat(),
+            'time': event['time'].isoformat(),
+            'capacity': event['capacity'],
+            'confirmed': entry['confirmed'],
+            'waitlisted': entry['waitlisted'],
+            'latest_registration_at': entry['latest'].isoformat() if entry['latest'] else None,
+            'departments': department_histogram(entry['departments']),
+        })
+    totals['departments'] = department_histogram(totals['departments'])
+    return {'totals': totals, 'events': rows}
+
+def department_histogram(counts):
+    # Largest first; users without a department are counted under null, last among equals.
+    return [
+        {'department': department, 'count': count}
+        for department, count in sorted(counts.items(), key=lambda item: (-item[1], item[0] is None, item[0] or ''))
+    ]
+
+# ------------------- CALENDAR VIEWS ------------------------
+
+class CalendarFeedLinksView(APIView):
+    # Subscription URLs for calendar apps; the token in them is the only credential.
+    # POST revokes the current links (e.g. one leaked) and returns new ones.
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        kinds = ['participant'] + (['coordinator'] if request.user.role == 'coordinator' else [])
+        return Response({
+            kind: request.build_absolute_uri(f'/api/calendar/{feed_token(kind, request.user)}.ics')
+            for kind in kinds
+        })
+
+    def post(self, request):
+        user = request.user
+        user.calendar_feed_version = F('calendar_feed_version') + 1
+        user.save(update_fields=['calendar_feed_version'])  # post_save also drops the cached user
+        user.refresh_from_db(fields=['calendar_feed_version'])
+        return self.get(request)
+
+class CalendarFeedView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        feed = read_feed_token(token)
+        if feed is None:
+            return Response({'error': 'Unknown calendar feed.'}, status=status.HTTP_404_NOT_FOUND)
+        response = streaming_response(request, stream_feed(*feed), 'text/calendar; charset=utf-8')
+        patch_cache_control(response, private=True, max_age=settings.ICAL_FEED_MAX_AGE)
+        return response
 
 # ------------------- REGISTRATION VIEWS ------------------------
 
+def register_user(user, event):
+    # ✅ Claim a seat, insert the registration and queue the email atomically;
+    # duplicates are rejected by the unique constraint, not a racy pre-check.
+    with transaction.atomic():
+        registration = Registration.objects.register(user, event)
+        invalidate_events(event.pk)
+        if registration.status == Registration.STATUS_WAITLISTED:
+            OutgoingEmail.objects.queue(
+                subject='Event Waitlist',
+                message=f'Hi {user.username}, "{event.title}" is full. You have been added to the waitlist.',
+                recipient_list=[user.email],
+            )
+        else:
+            OutgoingEmail.objects.queue(
+                subject='Event Registration Successful',
+                message=f'Hi {user.username}, you have successfully registered for the event "{event.title}".',
+                recipient_list=[user.email],
+            )
+    return registration
+
+def registration_response_data(registration):
+    if registration.status == Registration.STATUS_WAITLISTED:
+        return {'message': 'Event is full. You have been added to the waitlist.', 'status': registration.status}
+    return {'message': 'Registered successfully and confirmation email sent.', 'status': registration.status}
+
+ALREADY_REGISTERED = {'message': 'You have already registered for this event.'}
+EVENT_NOT_FOUND = {'error': 'Event not found.'}
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def register_for_event(request, event_id):
     try:
-        event = Event.objects.get(id=event_id)
-
-        # ✅ Prevent duplicate registrations
-        if Registration.objects.filter(user=request.user, event=event).exists():
-            return Response({'message': 'You have already registered for this event.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # ✅ Create the registration
-        Registration.objects.create(user=request.user, event=event)
-
-        # ✅ Send confirmation email to the participant's email
-        send_mail(
-            subject='Event Registration Successful',
-            message=f'Hi {request.user.username}, you have successfully registered for the event "{event.title}".',
-            from_email='amal007vadakkedath@gmail.com',
-            recipient_list=[request.user.email],
-            fail_silently=False,
-        )
+        event = Event.objects.only('id', 'title', 'coordinator_id').get(id=event_id)
+    except Event.DoesNotExist:
+        return Response(EVENT_NOT_FOUND, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({'message': 'Registered successfully and confirmation email sent.'}, status=status.HTTP_201_CREATED)
+    try:
+        registration = register_user(request.user, event)
+    except AlreadyRegistered:
+        return Response(ALREADY_REGISTERED, status=status.HTTP_400_BAD_REQUEST)
+    return Response(registration_response_data(registration), status=status.HTTP_201_CREATED)
 
-    except Event.DoesNotExist:
-        return Response({'error': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+class BulkRegistrationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # Rows of {"username": ..., "event": <id>} for events the caller
+        # coordinates (staff may enroll into any event).
+        started = time.perf_counter()
+        try:
+            rows = read_rows(request)
+        except BulkInputError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        results, touched = enroll(rows, request.user)
+        if touched:
+            invalidate_events(*touched)
+        summary = summarize(results, time.perf_counter() - started)
+        return Response(summary, status=status.HTTP_201_CREATED if touched else status.HTTP_400_BAD_REQUEST)
 
 
 class CancelRegistrationView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def delete(self, request, event_id):
         user = request.user
         try:
-            event = Event.objects.get(pk=event_id)
-            registration = Registration.objects.get(user=user, event=event)
-            registration.delete()
-
-            try:
-                send_mail(
+            event = Event.objects.only('id', 'title').get(pk=event_id)
+            with transaction.atomic():
+                promoted = Registration.objects.cancel(user, event)
+                invalidate_events(event.pk)
+                OutgoingEmail.objects.queue(
                     subject='Event Registration Cancelled',
                     message=f'Hi {user.username}, your registration for "{event.title}" has been cancelled.',
-                    from_email='amal007vadakkedath@gmail.com',
                     recipient_list=[user.email],
-                    fail_silently=False
                 )
-            except Exception as e:
-                print(f"Email sending failed: {e}")
+                queue_promotion_emails(event, promoted)
 
             return Response({'message': 'Registration cancelled successfully.'}, status=200)
 
         except Event.DoesNotExist:
             return Response({'error': 'Event not found.'}, status=404)
-        except Registration.DoesNotExist:
+        except NotRegistered:
             return Response({'error': 'You are not registered for this event.'}, status=400)
 
 class EventParticipantsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, event_id):
-        registrations = Registration.objects.filter(event__id=event_id)
-        serializer = RegistrationSerializer(registrations, many=True)
-        return Response(serializer.data)
+        return Response(registration_rows(registration_values(participants_queryset(event_id))))
+
+def participants_queryset(event_id):
+    return Registration.objects.filter(event__id=event_id)
+
+class EventParticipantsExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    formats = {
+        'csv': (stream_csv, 'text/csv; charset=utf-8'),
+        'ndjson': (stream_ndjson, 'application/x-ndjson; charset=utf-8'),
+    }
+
+    def get(self, request, event_id):
+        # ?output=csv (default) or ?output=ndjson; streamed so memory stays flat.
+        output = request.query_params.get('output', 'csv')
+        if output not in self.formats:
+            return Response({'error': 'Unsupported output format.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            event = Event.objects.only('id', 'title').get(pk=event_id, coordinator=request.user)
+        except Event.DoesNotExist:
+            return Response({'error': 'Event not found or not authorized'}, status=status.HTTP_404_NOT_FOUND)
+
+        stream, content_type = self.formats[output]
+        response = streaming_response(request, stream(event), content_type)
+        response['Content-Disposition'] = f'attachment; filename="event-{event.id}-participants.{output}"'
+        return response
+
+class EventStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+    breakdowns = ('department', 'college_name', 'year_of_study')
+
+    def get(self, request, event_id):
+        try:
+            event = Event.objects.only('id', 'capacity', 'registration_count').get(pk=event_id)
+        except Event.DoesNotExist:
+            return Response({'error': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        # One GROUP BY over every breakdown column; the per-column
+        # histograms are folded together in Python.
+        groups = (
+            Registration.objects.filter(event=event)
+            .values('status', *(f'user__{field}' for field in self.breakdowns))
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        waitlisted = 0
+        histograms = {field: Counter() for field in self.breakdowns}
+        for group in groups:
+            if group['status'] == Registration.STATUS_WAITLISTED:
+                waitlisted += group['total']
+                continue
+            for field in self.breakdowns:
+                histograms[field][group[f'user__{field}'] or None] += group['total']
+
+        data = {
+            'event': event.id,
+            'capacity': event.capacity,
+            'registration_count': event.registration_count,
+            'waitlisted': waitlisted,
+        }
+        for field, histogram in histograms.items():
+            data[f'by_{field}'] = [
+                {'value': value, 'count': total} for value, total in histogram.most_common()
+            ]
+        return Response(data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def registered_events(request):
-    registrations = Registration.objects.filter(user=request.user)
-    events = [reg.event for reg in registrations]
-    serializer = EventSerializer(events, many=True)
-    return Response(serializer.data)
+    validator = registered_events_validator(registered_events_state(request.user).first())
+    return conditional_response(
+        request, validator, lambda: event_rows(registered_events_queryset(request.user), prefix='event__'),
+    )
+
+def registered_events_state(user):
+    # A single query for everything the list depends on; deletes change the
+    # count or the user's registrations_version.
+    return (
+        User.objects.filter(pk=user.pk)
+        .annotate(
+            count=Count('registration'),
+            registrations=Max('registration__updated_at'),
+            events=Max('registration__event__updated_at'),
+            coordinators=Max('registration__event__coordinator__updated_at'),
+        )
+        .values_list('registrations_version', 'count', 'registrations', 'events', 'coordinators')
+    )
+
+def registered_events_validator(state):
+    return 'registered-events:' + ':'.join(str(value) for value in state)
+
+def registered_events_queryset(user):
+    # One joined query for the events and their coordinators.
+    return event_values(Registration.objects.filter(user=user), prefix='event__')
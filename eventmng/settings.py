@@ -1,10 +1,15 @@
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-i_nwu10n8-l42v%k86iyvj8@jplk4ah%pluwki#%wsi$s#_8ya'
+# It signs JWTs and calendar feed links; the fallback is public and for local use only.
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY', 'django-insecure-i_nwu10n8-l42v%k86iyvj8@jplk4ah%pluwki#%wsi$s#_8ya'
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -31,6 +36,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be first for CORS to work properly
+    'backend.middleware.MetricsMiddleware',
+    'backend.middleware.DatabaseRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,18 +65,159 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'eventmng.wsgi.application'
+ASGI_APPLICATION = 'eventmng.asgi.application'
+
+# SERVER_MODE=asgi runs gunicorn with uvicorn workers (see gunicorn.conf.py);
+# ASYNC_VIEWS then routes the hot read/registration endpoints to async views.
+# Deployments stay on WSGI unless the database is PostgreSQL with DB_POOL:
+# see the connection notes below.
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '1' if SERVER_MODE == 'asgi' else '0') == '1'
+
+# Database configuration, driven by the environment. DB_ENGINE selects
+# mysql (default), postgresql or sqlite; the MySQL defaults match local dev.
+_DB_ENGINES = {
+    'mysql': 'django.db.backends.mysql',
+    'postgresql': 'django.db.backends.postgresql',
+    'sqlite': 'django.db.backends.sqlite3',
+}
+DB_ENGINE = os.environ.get('DB_ENGINE', 'mysql')
+
+# Persistent connections: reuse a connection for DB_CONN_MAX_AGE seconds
+# instead of reconnecting per request, and ping it before reuse. Under ASGI
+# Django opens connections per request context and closes them when the
+# request ends, so persistent connections default to off there and every
+# request reconnects. Only PostgreSQL with DB_POOL reuses connections under
+# ASGI; serve MySQL with WSGI.
+_DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 60))
+_DB_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+
+if DB_ENGINE == 'sqlite':
+    _DB_DEFAULT = {
+        'NAME': os.environ.get('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': {
+            'timeout': 20,
+            # Take the write lock up front so concurrent writers queue on the
+            # busy timeout instead of failing with "database is locked".
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
+    }
+elif DB_ENGINE == 'postgresql':
+    _DB_DEFAULT = {
+        'NAME': os.environ.get('DB_NAME', 'event_db'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'OPTIONS': {'connect_timeout': 5},
+    }
+    if os.environ.get('DB_POOL') == '1':
+        # psycopg's connection pool (needs psycopg[pool]); Django requires
+        # CONN_MAX_AGE = 0 when pooling.
+        _DB_DEFAULT['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+        _DB_CONN_MAX_AGE = 0
+else:
+    _DB_DEFAULT = {
+        'NAME': os.environ.get('DB_NAME', 'event_db'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', '198022'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '3306'),
+        'OPTIONS': {'connect_timeout': 5},
+    }
 
-# MySQL Database Configuration
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'event_db',
-        'USER': 'root',
-        'PASSWORD': '198022',
-        'HOST': 'localhost',
-        'PORT': '3306',
+        'ENGINE': _DB_ENGINES[DB_ENGINE],
+        **_DB_DEFAULT,
+        'CONN_MAX_AGE': _DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': _DB_HEALTH_CHECKS,
     }
 }
+if os.environ.get('DB_TEST_NAME'):
+    DATABASES['default']['TEST'] = {'NAME': os.environ['DB_TEST_NAME']}
+
+# Optional read replica: DB_REPLICA_HOST (or DB_REPLICA_NAME, e.g. a second
+# SQLite file locally) adds a 'replica' alias that inherits everything else
+# from the primary. backend.routers.PrimaryReplicaRouter sends safe-request
+# reads there; users who just wrote read from the primary for
+# REPLICA_STICKY_SECONDS, which should exceed the usual replication lag.
+DATABASE_ROUTERS = ['backend.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA = None
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASE_REPLICA = 'replica'
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        **{
+            key: os.environ[f'DB_REPLICA_{key}']
+            for key in ('NAME', 'HOST', 'PORT', 'USER', 'PASSWORD') if os.environ.get(f'DB_REPLICA_{key}')
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+# Cache (used for versioned event list/detail payloads). Set REDIS_URL to share
+# it between workers; CACHE_DIR selects a file-based cache instead. Deployments
+# require REDIS_URL: `manage.py check --deploy` fails without it (backend.E001).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'eventmng',
+        }
+    }
+
+# Whether every worker and instance sees the same cache. Only Redis is; a
+# file cache is shared by the workers of one host, locmem by none.
+CACHE_SHARED = bool(os.environ.get('REDIS_URL'))
+
+EVENT_CACHE_TIMEOUT = int(os.environ.get('EVENT_CACHE_TIMEOUT', 300))  # seconds
+
+BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 10000))  # per bulk import request
+
+DELETION_INLINE_ROWS = int(os.environ.get('DELETION_INLINE_ROWS', 2000))  # larger deletions run as background jobs
+
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 60))  # seconds a JWT user stays cached
+
+USER_DETAIL_MAX_AGE = int(os.environ.get('USER_DETAIL_MAX_AGE', 60))  # seconds browsers may reuse /api/user/ unasked
+
+# Idempotency-Key responses (backend/idempotency.py) are kept in the cache above.
+# Every worker must see the keys, so the header is only honoured with a
+# shared cache unless IDEMPOTENCY_ENABLED says otherwise.
+IDEMPOTENCY_ENABLED = os.environ.get('IDEMPOTENCY_ENABLED', '1' if CACHE_SHARED else '0') == '1'
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 86400))  # seconds a stored response is replayed
+IDEMPOTENCY_WAIT = float(os.environ.get('IDEMPOTENCY_WAIT', 10))  # seconds a duplicate waits for the original
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get('IDEMPOTENCY_LOCK_TIMEOUT', 60))  # frees keys of crashed requests
+
+# iCalendar feeds: rendered VEVENT blocks are cached per event and dropped on edit/delete.
+ICAL_CACHE_TIMEOUT = int(os.environ.get('ICAL_CACHE_TIMEOUT', 86400))  # seconds
+ICAL_FEED_MAX_AGE = int(os.environ.get('ICAL_FEED_MAX_AGE', 900))  # seconds calendar apps may reuse a feed
+ICAL_UID_DOMAIN = os.environ.get('ICAL_UID_DOMAIN', 'archin-eventmng.onrender.com')
+
+# Request metrics are served per process at /api/metrics/; with several
+# gunicorn workers each scrape sees the worker that answered it.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # bearer token required to scrape; unset, only DEBUG serves them
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 0))  # 0 disables the slow-request log
+SLOW_REQUEST_SQL_LIMIT = 50  # statements kept per request for the slow-request log
 
 # Custom user model
 AUTH_USER_MODEL = 'backend.CustomUser'
@@ -78,6 +226,40 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Password hashing policy. The first hasher hashes new passwords; the others
+# only verify existing hashes, which are upgraded transparently on login.
+# "argon2" needs the optional argon2-cffi package.
+_PASSWORD_HASHERS = {
+    'scrypt': 'backend.hashers.TunedScryptPasswordHasher',
+    'argon2': 'backend.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'backend.hashers.TunedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# The scrypt defaults are Django's (and OWASP's N=2**14, r=8, p=5 minimum);
+# the login token buckets, not a cheaper hash, absorb login storms.
+PASSWORD_HASH_PARAMS = {
+    'scrypt_work_factor': int(os.environ.get('SCRYPT_WORK_FACTOR', 2 ** 14)),
+    'scrypt_block_size': int(os.environ.get('SCRYPT_BLOCK_SIZE', 8)),
+    'scrypt_parallelism': int(os.environ.get('SCRYPT_PARALLELISM', 5)),
+    'argon2_time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'argon2_memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),  # KiB
+    'argon2_parallelism': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+    'pbkdf2_iterations': int(os.environ.get('PBKDF2_ITERATIONS', 600000)),
+}
+
+# Login throttling: (burst, tokens refilled per second) per client IP and per
+# username, enforced before any password hashing. Set to {} to disable. A
+# whole campus can log in from one NAT address when registration opens, so
+# the per-IP bucket is generous; the per-username one stops password guessing.
+LOGIN_RATE_LIMITS = {
+    'ip': (300, 300 / 60),
+    'username': (5, 5 / 60),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -101,18 +283,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework configuration
 REST_FRAMEWORK = {
+    # Dispatches on the Authorization header to JWT (with a cached user
+    # lookup), Token or session authentication in a single step.
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.authentication.UnifiedAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed when installed, with the same bytes as DRF's JSONRenderer.
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer' if os.environ.get('FAST_JSON', '1') == '1'
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Proxies in front of the app (Render's router: 1). Client IPs for
+    # throttling come from the X-Forwarded-For entry the nearest proxy
+    # appended, not from whatever the client put in front of it.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
 }
 
 # CORS settings (for React frontend integration)
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 # Email backend settings (Gmail SMTP)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
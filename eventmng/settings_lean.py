@@ -0,0 +1,36 @@
+# Production profile for the JSON API: DJANGO_SETTINGS_MODULE=eventmng.settings_lean.
+# Everything in settings.py, minus the apps and middleware a bearer-token API
+# never uses, so workers import less, boot faster and stay smaller. Clients
+# authenticate with JWT only: no sessions, admin, messages or DRF tokens.
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'  # DEBUG also keeps every query of a request in memory
+
+_UNUSED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework.authtoken',
+}
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _UNUSED_APPS]
+
+# Session, CSRF and auth middleware only serve cookie logins; DRF sets
+# request.user itself. Clickjacking headers are moot for JSON.
+_UNUSED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in _UNUSED_MIDDLEWARE]
+
+# JSON only: the browsable API needs templates, static files and sessions.
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'][:1],
+}
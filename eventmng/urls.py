@@ -1,12 +1,9 @@
 
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from backend.urls import token_obtain_pair_view, token_refresh_view
 
 urlpatterns = [
-    path('api/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/login/', token_obtain_pair_view, name='token_obtain_pair'),
+    path('api/token/refresh/', token_refresh_view, name='token_refresh'),
     path('api/', include('backend.urls')),
 ]
@@ -0,0 +1,48 @@
+# Gunicorn settings: `gunicorn -c gunicorn.conf.py`
+# SERVER_MODE=asgi serves eventmng.asgi through uvicorn workers so async views
+# can hold many concurrent connections per process; the default stays WSGI.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+
+def cpu_count():
+    # CPUs this process may run on, which respects container CPU pinning.
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Sync workers block on the database, so run 2 per CPU + 1; an event-loop
+# worker keeps its CPU busy on its own. WEB_CONCURRENCY overrides both.
+_asgi = os.environ.get('SERVER_MODE', 'wsgi') == 'asgi'
+workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count() if _asgi else cpu_count() * 2 + 1))
+
+# Import Django once in the master and fork the workers from it: they start
+# without re-importing anything and share the loaded code copy-on-write.
+# Database connections are only opened on first use, inside each worker.
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers now and then so slow leaks and fragmentation can't grow
+# them without bound; the jitter keeps them from restarting together.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers into timeouts.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+if _asgi:
+    wsgi_app = 'eventmng.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'eventmng.wsgi:application'
+
+
+def when_ready(server):
+    # Move everything the preloaded app allocated out of the collector's
+    # generations, so collections in the workers don't touch (and copy) those pages.
+    if preload_app:
+        gc.freeze()